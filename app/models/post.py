@@ -1,11 +0,0 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.sql import func
-from db import Base
-
-class Post(Base):
-    __tablename__ = "posts"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    text = Column(String(1000000))
-    created_at = Column(DateTime, default=func.now()) 
\ No newline at end of file
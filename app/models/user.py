@@ -1,9 +0,0 @@
-from sqlalchemy import Column, Integer, String
-from db import Base
-
-class User(Base):
-    __tablename__ = "users"
-
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String(255), unique=True, index=True)
-    hashed_password = Column(String(255)) 
\ No newline at end of file
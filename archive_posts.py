@@ -0,0 +1,19 @@
+import argparse
+import json
+from repositories.cold import COLD_SEGMENT_DIR, ColdSegmentStore
+from repositories.factory import get_post_repository
+from services.archive_service import ARCHIVE_AFTER_DAYS, archive_old_posts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old posts from the hot store into compressed cold segments.")
+    parser.add_argument("--older-than-days", type=float, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--dir", default=COLD_SEGMENT_DIR,
+                        help="Cold segment directory (default: COLD_SEGMENT_DIR). Must be the directory the API reads from.")
+    args = parser.parse_args()
+    if not args.dir:
+        # Archiving into a directory the API doesn't read would make the moved posts disappear
+        parser.error("COLD_SEGMENT_DIR is not set; set it (as for the API) or pass --dir")
+
+    # The in-memory backend lives in the server process; use ARCHIVE_INTERVAL_SECONDS there instead.
+    report = archive_old_posts(get_post_repository(), ColdSegmentStore(args.dir), args.older_than_days)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,113 @@
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from load_data import _generate_posts
+from repositories.memory import MemoryPostRepository
+
+# --- In-Memory Post Footprint Benchmark ---
+#
+# Loads generated posts into a MemoryPostRepository and reports bytes per post,
+# with and without the post texts, for example:
+#
+#   python -m benchmarks.memory_footprint --posts 1000000 10000000
+#
+# Sizes are summed with sys.getsizeof over the records, the objects their slots
+# point to (id, user_id and created_ts, texts), the per-user lists and the dict
+# holding them. As a cross-check, a sample of up to --sample posts is loaded
+# again under tracemalloc (tracing all 10M posts would roughly double the memory needed).
+
+def _referenced_size(value) -> int:
+    """
+    Returns the size of an object a record points to; small ints are cached by the interpreter and shared.
+    """
+    if type(value) is int and -5 <= value <= 256:
+        return 0
+    return sys.getsizeof(value)
+
+def measure(repository: MemoryPostRepository) -> dict:
+    """
+    Sums the memory held by a repository's records, the objects they reference and the per-user lists.
+
+    Returns:
+        dict: Byte totals for "records" (records with their id, user_id and created_ts objects),
+              "texts" and "index" (the per-user lists and the dict holding them).
+    """
+    sizes = {"records": 0, "texts": 0, "index": sys.getsizeof(repository._posts)}
+    for user_id, posts in repository._posts.items():
+        sizes["index"] += sys.getsizeof(posts) + _referenced_size(user_id)
+        for post in posts:
+            sizes["records"] += sys.getsizeof(post) + _referenced_size(post.id) + _referenced_size(post.created_ts)
+            # The dict key is shared when the record holds the same int object
+            if post.user_id is not user_id:
+                sizes["records"] += _referenced_size(post.user_id)
+            sizes["texts"] += sys.getsizeof(post.text)
+    return sizes
+
+def load(posts: int, users: int, batch_size: int) -> MemoryPostRepository:
+    """
+    Loads `posts` generated posts of `users` users into a new MemoryPostRepository.
+    """
+    repository = MemoryPostRepository()
+    params = {
+        "batch_size": batch_size, "total": posts, "start_id": 1,
+        "users": users, "user_start_id": 1, "days": 365, "now": time.time(),
+    }
+    for batch in range((posts + batch_size - 1) // batch_size):
+        repository.bulk_load(_generate_posts(batch, **params))
+    return repository
+
+def traced_bytes_per_post(posts: int, users: int, batch_size: int) -> float:
+    """
+    Loads `posts` posts under tracemalloc and returns the bytes still allocated per post afterwards.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        repository = load(posts, users, batch_size)
+        gc.collect()
+        allocated = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del repository
+    return allocated / posts
+
+def run(posts: int, users: int, batch_size: int, sample: int) -> dict:
+    """
+    Loads `posts` generated posts of `users` users and returns the measured footprint.
+    """
+    started = time.perf_counter()
+    repository = load(posts, users, batch_size)
+    elapsed = time.perf_counter() - started
+
+    sizes = measure(repository)
+    result = {
+        "posts": posts,
+        "load_s": round(elapsed, 1),
+        "bytes_per_post": round(sum(sizes.values()) / posts, 1),
+        "overhead_bytes_per_post": round((sizes["records"] + sizes["index"]) / posts, 1),
+        "text_bytes_per_post": round(sizes["texts"] / posts, 1),
+    }
+    del repository
+    gc.collect()
+    # Same user count, so the sample has a similar number of posts per user list
+    sample = min(posts, sample)
+    result["traced_bytes_per_post"] = round(traced_bytes_per_post(sample, users, min(batch_size, sample)), 1)
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report bytes per post of the in-memory post store.")
+    parser.add_argument("--posts", type=int, nargs="+", default=[1_000_000, 10_000_000], help="Post counts to measure")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=200_000, help="Posts loaded under tracemalloc as a cross-check")
+    args = parser.parse_args()
+
+    print(f"{'posts':>12} {'load s':>8} {'bytes/post':>11} {'overhead':>9} {'text':>8} {'traced':>8}")
+    for posts in args.posts:
+        result = run(posts, args.users, args.batch_size, args.sample)
+        print(f"{result['posts']:>12,} {result['load_s']:>8} {result['bytes_per_post']:>11} "
+              f"{result['overhead_bytes_per_post']:>9} {result['text_bytes_per_post']:>8} "
+              f"{result['traced_bytes_per_post']:>8}", flush=True)
@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import time
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from benchmarks.repositories import summarize
+from main import app
+from repositories.base import PostRecord
+from schemas.user import UserOut
+from utils.serialization import FastJSONResponse
+
+# --- Response Serialization Benchmark ---
+#
+# Compares, per endpoint, FastAPI's regular path (response_model validation,
+# jsonable_encoder, JSONResponse) with returning FastJSONResponse directly:
+#
+#   python -m benchmarks.serialization --sizes 10 1000 100000
+#
+# List endpoints (GET /posts, GET /timeline) are measured for each list size;
+# single-object endpoints (POST /posts, /signup, /login) render one object.
+
+def make_posts(count: int) -> list[PostRecord]:
+    return [PostRecord(number, number % 1000 + 1, f"post number {number} with some text", 1.7e9 + number) for number in range(1, count + 1)]
+
+def endpoints(size: int) -> list[tuple[str, str, object, object]]:
+    """
+    Returns (method, path, regular content, fast content) for each endpoint.
+
+    The regular path gets the pydantic models the services used to return;
+    the fast path gets what they return now.
+    """
+    posts = make_posts(size)
+    post_outs = [post.to_post_out() for post in posts]
+    user = UserOut(id=1, email="someone@example.com", token="header.payload.signature")
+    return [
+        ("GET", "/posts", post_outs, posts),
+        ("GET", "/timeline", post_outs, posts),
+        ("POST", "/posts", post_outs[0], posts[0]),
+        ("POST", "/signup", user, user),
+        ("POST", "/login", user, user),
+    ]
+
+def response_field(method: str, path: str):
+    return next(route for route in app.routes if route.path == path and method in route.methods).response_field
+
+def run(size: int, repeat: int) -> dict:
+    """
+    Renders each endpoint's response `repeat` times on both paths.
+
+    Returns:
+        dict: {(method, path): {"regular": summary, "fast": summary}} (see summarize).
+    """
+    loop = asyncio.new_event_loop()
+    results = {}
+    for method, path, regular_content, fast_content in endpoints(size):
+        field = response_field(method, path)
+        regular, fast = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            JSONResponse(loop.run_until_complete(serialize_response(field=field, response_content=regular_content)))
+            regular.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            FastJSONResponse(fast_content)
+            fast.append(time.perf_counter() - started)
+        results[(method, path)] = {"regular": summarize(regular), "fast": summarize(fast)}
+    loop.close()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response serialization per endpoint.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000], help="Posts per list response")
+    parser.add_argument("--budget", type=int, default=500000, help="Posts rendered per list size and path; sets the repeat count")
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<16} {'posts':>8} {'regular p50 ms':>15} {'fast p50 ms':>12} {'speedup':>8}")
+    for size in args.sizes:
+        results = run(size, max(5, min(1000, args.budget // size)))
+        for (method, path), summary in results.items():
+            if method == "POST" and size != args.sizes[0]:
+                continue # Single-object responses don't depend on the list size
+            regular, fast = summary["regular"]["p50_ms"], summary["fast"]["p50_ms"]
+            posts = size if method == "GET" else 1
+            print(f"{method + ' ' + path:<16} {posts:>8,} {regular:>15.3f} {fast:>12.3f} {regular / max(fast, 1e-9):>7.1f}x")
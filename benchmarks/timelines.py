@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import random
+import time
+import jwt
+import services.timeline_service
+from auth import ALGORITHM, SECRET_KEY
+from benchmarks.repositories import summarize
+from repositories.follows import MemoryFollowRepository
+from repositories.memory import MemoryPostRepository
+from services.timeline_service import TimelineService
+
+# --- Home Timeline Benchmark ---
+#
+# Measures fan-out cost per post by follower count and timeline read latency
+# (precomputed, cold rebuild and with pull-mode authors) on the in-memory backends:
+#
+#   python -m benchmarks.timelines --users 10000 --follows 100 --posts 50000
+#
+# Follow counts are heavy-tailed: a few authors have most of the followers.
+
+def build(users: int, follows: int, rng: random.Random) -> TimelineService:
+    """
+    Creates a TimelineService over in-memory repositories with a generated follow graph.
+    """
+    follow_repository = MemoryFollowRepository()
+    for follower_id in range(1, users + 1):
+        for _ in range(follows):
+            followee_id = 1 + int(users * rng.random() ** 3)
+            if followee_id != follower_id:
+                follow_repository.follow(follower_id, followee_id)
+    return TimelineService(post_repository=MemoryPostRepository(), follow_repository=follow_repository)
+
+def bucket(followers: int) -> str:
+    for limit in (10, 100, 1000, 10000):
+        if followers <= limit:
+            return f"<={limit}"
+    return ">10000"
+
+def run(users: int, follows: int, posts: int, reads: int, limit: int) -> dict:
+    rng = random.Random(0)
+    service = build(users, follows, rng)
+    tokens = {user_id: jwt.encode({"sub": str(user_id)}, SECRET_KEY, algorithm=ALGORITHM) for user_id in range(1, users + 1)}
+    results = {}
+    loop = asyncio.new_event_loop()
+
+    # Cold reads: no precomputed timelines yet, each one is rebuilt from followees' posts
+    for post_number in range(posts // 2):
+        service.post_repository.add(1 + int(users * rng.random() ** 2), f"post {post_number}")
+    readers = [rng.randrange(1, users + 1) for _ in range(reads)]
+    latencies = []
+    for user_id in dict.fromkeys(readers):
+        started = time.perf_counter()
+        loop.run_until_complete(service.get_timeline(tokens[user_id], limit))
+        latencies.append(time.perf_counter() - started)
+    results["read (rebuild)"] = summarize(latencies)
+
+    # Fan-out on write, grouped by the author's follower count
+    fan_out = {}
+    for post_number in range(posts - posts // 2):
+        post = service.post_repository.add(1 + int(users * rng.random() ** 2), f"post {post_number}")
+        started = time.perf_counter()
+        service.fan_out_post(post)
+        elapsed = time.perf_counter() - started
+        fan_out.setdefault(bucket(service.follow_repository.follower_count(post.user_id)), []).append(elapsed)
+    for name in sorted(fan_out, key=lambda name: int(name.strip("<=>"))):
+        results[f"fan-out {name} followers"] = summarize(fan_out[name])
+
+    # Warm reads from the precomputed timelines (plus any pull-mode authors)
+    latencies = []
+    for user_id in readers:
+        started = time.perf_counter()
+        loop.run_until_complete(service.get_timeline(tokens[user_id], limit))
+        latencies.append(time.perf_counter() - started)
+    results["read (precomputed)"] = summarize(latencies)
+    results["pull-mode authors"] = sum(
+        1 for count in services.timeline_service._follower_counts.values()
+        if count > services.timeline_service.FANOUT_MAX_FOLLOWERS
+    )
+    loop.close()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark timeline reads and fan-out on write.")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--follows", type=int, default=50, help="Follows per user")
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=50, help="Posts per timeline read")
+    parser.add_argument("--fanout-max-followers", type=int, help="Override FANOUT_MAX_FOLLOWERS")
+    args = parser.parse_args()
+    if args.fanout_max_followers is not None:
+        services.timeline_service.FANOUT_MAX_FOLLOWERS = args.fanout_max_followers
+
+    results = run(args.users, args.follows, args.posts, args.reads, args.limit)
+    pull_authors = results.pop("pull-mode authors")
+    print(f"{'operation':<28} {'ops/s':>12} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, summary in results.items():
+        print(f"{name:<28} {summary['ops_per_s']:>12,.0f} {summary['p50_ms']:>10.3f} {summary['p99_ms']:>10.3f}")
+    print(f"Authors in pull mode: {pull_authors}")
@@ -1,4 +1,13 @@
+import os
 from cachetools import TTLCache
 
 # Create a cache with a maximum size of 100 items and TTL of 5 minutes
-cache = TTLCache(maxsize=100, ttl=300) 
\ No newline at end of file
+cache = TTLCache(maxsize=100, ttl=300)
+
+# Bounded cache of email -> (user_id, hashed_password) used by login.
+# Entries for an email are replaced on signup.
+user_lookup_cache = TTLCache(maxsize=10000, ttl=300)
+
+# Unknown emails (negative entries), so repeated failed logins don't hit the database.
+# Kept only briefly: a signup handled by another worker doesn't clear this worker's entry.
+user_lookup_negative_cache = TTLCache(maxsize=10000, ttl=int(os.getenv("USER_LOOKUP_NEGATIVE_TTL", "5")))
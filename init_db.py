@@ -1,6 +1,7 @@
-from database import engine, Base
+from database import engine, Base, replica_engines
 from models.user import User
 from models.post import Post
+from models.follow import Follow
 
 def init_db():
     """
@@ -8,6 +9,10 @@ def init_db():
     """
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    # Replicas normally get the schema through replication; this covers local
+    # stand-ins (e.g. SQLite files) and is a no-op where the tables already exist.
+    for replica_engine in replica_engines:
+        Base.metadata.create_all(bind=replica_engine)
     print("Database tables created successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,475 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from itertools import islice
+
+# --- Bulk Data Loader ---
+#
+# Seeds users and posts at production scale, either generated with realistic
+# distributions or streamed from NDJSON/CSV files, for example:
+#
+#   python load_data.py generate --users 1000000 --posts 10000000 --workers 8
+#   python load_data.py import --posts-file posts.ndjson --workers 4
+#
+# Rows are written in batches through executemany (pymysql turns these into
+# multi-row INSERTs) by parallel worker processes. Finished batches are recorded
+# in a checkpoint file, so an interrupted load resumes where it stopped. The
+# checkpoint belongs to one load (command, input files, target and sizes); it is
+# refused for any other load.
+
+# Password shared by all generated users ("password123"); hashing millions of
+# distinct passwords with bcrypt would dominate the load time.
+GENERATED_PASSWORD_HASH = "$2b$12$PcPRJPxWGkL4jN4.kCRbUuy8l9g29/DSsufLlXs61hcKmiq1KI.3y"
+
+_WORDS = (
+    "the a to of and in is it you that he was for on are with as I his they be at one have this from "
+    "or had by hot word but what some we can out other were all there when up use your how said an each "
+    "she which do their time if will way about many then them write would like so these her long make "
+    "thing see him two has look more day could go come did number sound no most people my over know "
+    "water than call first who may down side been now find any new work part take get place made live"
+).split()
+
+_engine = None
+
+_text_pool = None
+
+def _get_text_pool(size: int = 2_000_000) -> str:
+    """
+    Returns a large block of random words that post texts are sliced from.
+    """
+    global _text_pool
+    if _text_pool is None:
+        rng = random.Random(0)
+        words = []
+        length = 0
+        while length < size:
+            word = rng.choice(_WORDS)
+            words.append(word)
+            length += len(word) + 1
+        _text_pool = " ".join(words)
+    return _text_pool
+
+def _init_worker(url: str):
+    """
+    Creates one engine per worker process.
+    """
+    global _engine
+    from db import create_db_engine
+    _engine = create_db_engine(url)
+
+def _already_loaded(table, row: dict) -> bool:
+    """
+    Checks whether the row with `row`'s ID holds the same user (email) or post (author and text).
+    """
+    from sqlalchemy import select
+
+    key = ("email",) if table.name == "users" else ("user_id", "text")
+    with _engine.connect() as connection:
+        existing = connection.execute(select(*(table.c[column] for column in key)).where(table.c.id == row["id"])).first()
+    return existing is not None and tuple(existing) == tuple(row[column] for column in key)
+
+def _insert_batch(table_name: str, rows: list, generated: bool = False, resuming: bool = False) -> tuple[int, list]:
+    """
+    Inserts a batch of rows in one transaction with executemany.
+
+    Generated rows have explicit, consecutive IDs, so a generated batch that hits
+    a duplicate key counts as done once all of its IDs are found in the table
+    (an interrupted run committed it). Imported rows can collide with existing
+    data, so a failed import batch is retried row by row instead. Imported rows
+    always carry an ID (see _convert_rows); when resuming a batch an interrupted
+    run had started, rows whose ID already holds the same data were loaded by
+    that run and are skipped rather than rejected.
+
+    Args:
+        table_name (str): "users" or "posts".
+        rows (list): Row dicts to insert.
+        generated (bool): Whether the rows were generated with explicit IDs.
+        resuming (bool): Whether an interrupted run may already have loaded some of the rows.
+
+    Returns:
+        tuple[int, list]: Rows inserted, and (index in batch, error) for each rejected row.
+
+    Raises:
+        IntegrityError: If a generated batch conflicts with rows it didn't write.
+    """
+    from sqlalchemy import func, select
+    from sqlalchemy.exc import IntegrityError
+    from models.post import Post
+    from models.user import User
+
+    table = {"users": User.__table__, "posts": Post.__table__}[table_name]
+    try:
+        with _engine.begin() as connection:
+            connection.execute(table.insert(), rows)
+        return len(rows), []
+    except IntegrityError:
+        if generated:
+            ids = [row["id"] for row in rows]
+            with _engine.connect() as connection:
+                found = connection.execute(
+                    select(func.count()).select_from(table).where(table.c.id.between(min(ids), max(ids)))
+                ).scalar()
+            if found == len(rows):
+                return 0, []
+            raise
+
+    inserted = 0
+    rejected = []
+    for index, row in enumerate(rows):
+        try:
+            with _engine.begin() as connection:
+                connection.execute(table.insert(), row)
+            inserted += 1
+        except IntegrityError as error:
+            if not (resuming and _already_loaded(table, row)):
+                rejected.append((index, str(error.orig)))
+    return inserted, rejected
+
+# --- Row Generation ---
+
+def _generate_users(batch: int, batch_size: int, total: int, start_id: int) -> list:
+    first = batch * batch_size
+    return [
+        {"id": start_id + i, "email": f"user{start_id + i}@example.com", "hashed_password": GENERATED_PASSWORD_HASH}
+        for i in range(first, min(first + batch_size, total))
+    ]
+
+def _generate_posts(batch: int, batch_size: int, total: int, start_id: int, users: int, user_start_id: int, days: int, now: float) -> list:
+    text_pool = _get_text_pool()
+    rng = random.Random(batch) # Seeded per batch, so a resumed load regenerates identical rows
+    rows = []
+    first = batch * batch_size
+    for i in range(first, min(first + batch_size, total)):
+        # Few users write most posts (heavy-tailed), lengths are log-normal
+        # (median ~90 chars, capped at 1 MB), and recent posts are more frequent.
+        user_id = user_start_id + int(users * rng.random() ** 3)
+        length = min(int(rng.lognormvariate(4.5, 1.0)) + 1, 1_000_000, len(text_pool))
+        offset = rng.randrange(len(text_pool) - length + 1)
+        age = timedelta(days=days * rng.random() ** 2)
+        rows.append({
+            "id": start_id + i,
+            "user_id": user_id,
+            "text": text_pool[offset:offset + length],
+            "created_at": datetime.fromtimestamp(now) - age,
+        })
+    return rows
+
+def _generate_and_insert(table_name: str, batch: int, params: dict) -> tuple[int, list]:
+    if table_name == "users":
+        rows = _generate_users(batch, params["batch_size"], params["total"], params["start_id"])
+    else:
+        rows = _generate_posts(batch, **params)
+    return _insert_batch(table_name, rows, generated=True)
+
+# --- File Import ---
+
+def _read_rows(path: str):
+    """
+    Streams rows from an NDJSON or CSV file without loading it into memory.
+    """
+    with open(path, newline="") as source:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+def _convert_rows(table_name: str, rows: list, first_id: int, now: float) -> list:
+    """
+    Converts file rows to table rows.
+
+    Rows without an ID get `first_id` plus their position in the file, and posts
+    without a creation time get `now`: both are fixed for the whole load, so a
+    resumed load converts every row exactly as before.
+    """
+    converted = []
+    for position, row in enumerate(rows, start=first_id):
+        if table_name == "users":
+            converted.append({
+                "id": int(row["id"]) if row.get("id") else position,
+                "email": row["email"],
+                "hashed_password": row.get("hashed_password") or GENERATED_PASSWORD_HASH,
+            })
+        else:
+            converted.append({
+                "id": int(row["id"]) if row.get("id") else position,
+                "user_id": int(row["user_id"]),
+                "text": row["text"],
+                "created_at": datetime.fromisoformat(row["created_at"]) if row.get("created_at") else datetime.fromtimestamp(now),
+            })
+    return converted
+
+def _convert_and_insert(table_name: str, rows: list, first_id: int, now: float, resuming: bool) -> tuple[int, list]:
+    return _insert_batch(table_name, _convert_rows(table_name, rows, first_id, now), resuming=resuming)
+
+# --- Checkpointing and Progress ---
+
+def _describe_load(args) -> dict:
+    """
+    Identifies a load: the command, target (without password), batch size and
+    either the generated sizes or the input files (path, size and mtime).
+    """
+    from sqlalchemy.engine import make_url
+
+    load = {
+        "command": args.command,
+        "target": make_url(args.target).render_as_string(hide_password=True),
+        "batch_size": args.batch_size,
+    }
+    if args.command == "generate":
+        load.update(users=args.users, posts=args.posts, days=args.days)
+    else:
+        for name in ("users_file", "posts_file"):
+            path = getattr(args, name)
+            if path:
+                stat = os.stat(path)
+                load[name] = {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+    return load
+
+def _checkpoint_path(args, load: dict) -> str:
+    """
+    Returns --checkpoint, or a default path derived from the load so different loads never share one.
+    """
+    if args.checkpoint:
+        return args.checkpoint
+    digest = hashlib.sha256(json.dumps(load, sort_keys=True).encode()).hexdigest()[:12]
+    return f".load_data.{digest}.checkpoint.json"
+
+class Checkpoint:
+    """
+    Records started and finished batches per table in a JSON file so a load can resume.
+
+    A batch is marked started before it is submitted, so after an interruption
+    the batches that may be partly loaded are known (started but not done).
+    """
+
+    def __init__(self, path: str, load: dict):
+        """
+        Args:
+            path (str): Checkpoint file; created on the first save.
+            load (dict): The load this checkpoint belongs to (see _describe_load).
+
+        Raises:
+            SystemExit: If the file records a different load.
+        """
+        self.path = path
+        self.state = {"load": load}
+        if os.path.exists(path):
+            with open(path) as checkpoint_file:
+                self.state = json.load(checkpoint_file)
+            if self.state.get("load") != load:
+                raise SystemExit(
+                    f"Checkpoint {path} belongs to a different load:\n  {self.state.get('load')}\n"
+                    f"not\n  {load}\nPass another --checkpoint, or delete it to start over."
+                )
+
+    def done(self, table_name: str) -> set:
+        return set(self.state.get(table_name, {}).get("done", []))
+
+    def started(self, table_name: str) -> set:
+        return set(self.state.get(table_name, {}).get("started", []))
+
+    def get(self, key: str, default=None):
+        return self.state.get(key, default)
+
+    def set(self, key: str, value):
+        self.state[key] = value
+        self._save()
+
+    def mark_started(self, table_name: str, batch: int):
+        started = self.state.setdefault(table_name, {}).setdefault("started", [])
+        if batch not in started: # Already there when a resumed load retries the batch
+            started.append(batch)
+        self._save()
+
+    def mark_done(self, table_name: str, batch: int):
+        table_state = self.state.setdefault(table_name, {})
+        table_state.setdefault("done", []).append(batch)
+        if batch in table_state.get("started", []):
+            table_state["started"].remove(batch)
+        self._save()
+
+    def _save(self):
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(self.state, checkpoint_file)
+        os.replace(temporary_path, self.path)
+
+def _run_batches(executor, workers: int, table_name: str, tasks, checkpoint: Checkpoint, batch_size: int):
+    """
+    Runs (batch, function, args) tasks with at most 2 x workers in flight and reports rows/second.
+
+    Rejected rows are reported by their row number in the input (1-based, not
+    counting a CSV header) before their batch is marked done.
+    """
+    started = time.perf_counter()
+    loaded = 0
+    rejected = 0
+    in_flight = {}
+    last_report = started
+
+    def collect(done):
+        nonlocal loaded, rejected
+        for future in done:
+            batch = in_flight.pop(future)
+            inserted, rejected_rows = future.result()
+            loaded += inserted
+            rejected += len(rejected_rows)
+            for index, error in rejected_rows:
+                print(f"  {table_name}: row {batch * batch_size + index + 1} rejected: {error}", file=sys.stderr)
+            checkpoint.mark_done(table_name, batch)
+
+    for batch, function, args in tasks:
+        if len(in_flight) >= workers * 2:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(done)
+        checkpoint.mark_started(table_name, batch)
+        in_flight[executor.submit(function, *args)] = batch
+        if time.perf_counter() - last_report > 5:
+            last_report = time.perf_counter()
+            print(f"  {table_name}: {loaded} rows, {loaded / (last_report - started):,.0f} rows/s", file=sys.stderr)
+    collect(in_flight.copy())
+
+    elapsed = time.perf_counter() - started
+    print(f"Loaded {loaded} {table_name} in {elapsed:.1f}s ({loaded / max(elapsed, 1e-9):,.0f} rows/s)"
+          + (f", {rejected} rows rejected" if rejected else ""))
+
+def _max_id(url: str, table_name: str) -> int:
+    from sqlalchemy import func, select
+    from db import create_db_engine
+    from models.post import Post
+    from models.user import User
+
+    table = {"users": User.__table__, "posts": Post.__table__}[table_name]
+    with create_db_engine(url).connect() as connection:
+        return connection.execute(select(func.max(table.c.id))).scalar() or 0
+
+# --- Commands ---
+
+def generate(args):
+    """
+    Generates users and posts into the target database (or the in-memory store).
+    """
+    now = time.time()
+    if args.target == "memory":
+        generate_into_memory(args, now)
+        return
+
+    load = _describe_load(args)
+    checkpoint = Checkpoint(_checkpoint_path(args, load), load)
+    # IDs are fixed on the first run so a resumed load continues with the same rows
+    if checkpoint.get("user_start_id") is None:
+        checkpoint.set("user_start_id", _max_id(args.target, "users") + 1)
+        checkpoint.set("post_start_id", _max_id(args.target, "posts") + 1)
+        checkpoint.set("now", now)
+    user_start_id, post_start_id, now = checkpoint.get("user_start_id"), checkpoint.get("post_start_id"), checkpoint.get("now")
+
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.target,)) as executor:
+        for table_name, total, params in (
+            ("users", args.users, {"batch_size": args.batch_size, "total": args.users, "start_id": user_start_id}),
+            ("posts", args.posts, {
+                "batch_size": args.batch_size, "total": args.posts, "start_id": post_start_id,
+                "users": max(args.users, 1), "user_start_id": user_start_id, "days": args.days, "now": now,
+            }),
+        ):
+            done = checkpoint.done(table_name)
+            batches = (total + args.batch_size - 1) // args.batch_size
+            tasks = (
+                (batch, _generate_and_insert, (table_name, batch, params))
+                for batch in range(batches) if batch not in done
+            )
+            _run_batches(executor, args.workers, table_name, tasks, checkpoint, args.batch_size)
+
+def generate_into_memory(args, now: float):
+    """
+    Builds posts directly in a MemoryPostRepository and reports the load rate and size.
+    """
+    from repositories.memory import MemoryPostRepository
+
+    repository = MemoryPostRepository()
+    batches = (args.posts + args.batch_size - 1) // args.batch_size
+    params = {
+        "batch_size": args.batch_size, "total": args.posts, "start_id": 1,
+        "users": max(args.users, 1), "user_start_id": 1, "days": args.days, "now": now,
+    }
+    started = time.perf_counter()
+    loaded = sum(repository.bulk_load(_generate_posts(batch, **params)) for batch in range(batches))
+    elapsed = time.perf_counter() - started
+
+    # Records, their texts and the per-user lists holding them
+    size = sum(
+        sys.getsizeof(posts) + sum(sys.getsizeof(post) + sys.getsizeof(post.text) for post in posts)
+        for posts in repository._posts.values()
+    )
+    print(f"Loaded {loaded} posts in memory in {elapsed:.1f}s ({loaded / max(elapsed, 1e-9):,.0f} rows/s), "
+          f"{size / max(loaded, 1):,.0f} bytes/post")
+
+def import_files(args):
+    """
+    Streams users and posts from NDJSON/CSV files into the target database.
+    """
+    load = _describe_load(args)
+    checkpoint = Checkpoint(_checkpoint_path(args, load), load)
+    # IDs for rows without one, and the default creation time, are fixed on the first run
+    if checkpoint.get("user_start_id") is None:
+        checkpoint.set("user_start_id", _max_id(args.target, "users") + 1)
+        checkpoint.set("post_start_id", _max_id(args.target, "posts") + 1)
+        checkpoint.set("now", time.time())
+    now = checkpoint.get("now")
+
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.target,)) as executor:
+        for table_name, path in (("users", args.users_file), ("posts", args.posts_file)):
+            if not path:
+                continue
+            start_id = checkpoint.get("user_start_id" if table_name == "users" else "post_start_id")
+            done, started = checkpoint.done(table_name), checkpoint.started(table_name)
+            rows = _read_rows(path)
+
+            def tasks():
+                batch = 0
+                while True:
+                    chunk = list(islice(rows, args.batch_size))
+                    if not chunk:
+                        return
+                    if batch not in done:
+                        first_id = start_id + batch * args.batch_size
+                        yield batch, _convert_and_insert, (table_name, chunk, first_id, now, batch in started)
+                    batch += 1
+
+            _run_batches(executor, args.workers, table_name, tasks(), checkpoint, args.batch_size)
+
+if __name__ == "__main__":
+    from db import SQLALCHEMY_DATABASE_URL
+
+    parser = argparse.ArgumentParser(description="Bulk-load users and posts for seeding and benchmarking.")
+    parser.add_argument("--target", default=SQLALCHEMY_DATABASE_URL,
+                        help="Database URL to load into, or 'memory' (generate only). Defaults to the primary database.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT batch")
+    parser.add_argument("--checkpoint",
+                        help="Progress file used to resume an interrupted load. "
+                             "Defaults to a file named after the load (command, files, target, sizes).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="Generate users and posts")
+    generate_parser.add_argument("--users", type=int, default=100000)
+    generate_parser.add_argument("--posts", type=int, default=1000000)
+    generate_parser.add_argument("--days", type=int, default=365, help="Spread post creation times over this many days")
+
+    import_parser = commands.add_parser("import", help="Import users and posts from NDJSON or CSV files")
+    import_parser.add_argument("--users-file")
+    import_parser.add_argument("--posts-file")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args)
+    else:
+        import_files(args)
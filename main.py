@@ -1,12 +1,44 @@
-from fastapi import FastAPI, Depends, Header
+import asyncio
+import sys
+from fastapi import FastAPI, Depends, Header, Query
+from typing import Optional
+from fastapi.responses import JSONResponse
 from services.user_service import UserService
 from services.post_service import PostService
+from services.timeline_service import TimelineService
 from schemas.user import UserCreate, UserLogin, UserOut
 from schemas.post import PostCreate, PostOut
 from auth import get_current_user
+from utils.admission import AdmissionControlMiddleware, admission_stats
+from utils.consistency import ReadYourWritesMiddleware
+from utils.profiling import ProfilingMiddleware
+from utils.serialization import FastJSONResponse
+from utils.tracing import SQL_TRACE, SqlTracingMiddleware, flush_traces, install_sql_tracing
+from utils.warmup import run_warmup, warmup_state
+from repositories.cold import get_cold_store
+from repositories.factory import get_post_repository
+from services.archive_service import ARCHIVE_INTERVAL_SECONDS, archive_old_posts
+from repositories.sql import PURGE_BATCH_SIZE, PURGE_INTERVAL_SECONDS, SOFT_DELETE
 
-# Create the FastAPI application instance
-app = FastAPI()
+# Create the FastAPI application instance.
+# Responses are rendered with orjson when available (stdlib json otherwise).
+app = FastAPI(default_response_class=FastJSONResponse)
+
+# Carries each client's last write time in a signed cookie, so reads after a write
+# go to the primary whichever worker serves them
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Opt-in per-request profiling (X-Profile header or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+# Per-request SQL query tracing with N+1 detection (SQL_TRACE=1)
+if SQL_TRACE:
+    install_sql_tracing()
+    app.add_middleware(SqlTracingMiddleware)
+    app.add_event_handler("shutdown", flush_traces)
+
+# Per-route-class concurrency limits and load shedding (added last, so it runs first)
+app.add_middleware(AdmissionControlMiddleware)
 
 # --- Dependency Injection Functions ---
 
@@ -21,11 +53,105 @@ def get_user_service() -> UserService:
 # Dependency injection for PostService
 def get_post_service() -> PostService:
     """
-    Provides a PostService instance with a database session.
+    Provides a PostService instance backed by the configured post repository.
     This is used by FastAPI's dependency injection.
     """
     return PostService()
 
+# Dependency injection for TimelineService
+def get_timeline_service() -> TimelineService:
+    """
+    Provides a TimelineService instance backed by the configured repositories.
+    This is used by FastAPI's dependency injection.
+    """
+    return TimelineService()
+
+# --- Startup and Health Checks ---
+
+@app.on_event("startup")
+async def check_post_storage():
+    """
+    Creates the post repository up front, so configuration errors (e.g. a missing
+    POST_ID_WORKER_ID for sharded storage) stop the worker instead of failing requests.
+    """
+    get_post_repository()
+
+@app.on_event("startup")
+async def start_warmup():
+    """
+    Starts the warmup phases (connection pool, serialization paths, cache preload)
+    in the background so /healthz answers immediately while /readyz waits for them.
+    """
+    app.state.warmup_task = asyncio.create_task(run_warmup())
+
+async def _archive_loop():
+    # Periodically move old posts to cold segments, off the event loop
+    loop = asyncio.get_running_loop()
+    post_service = PostService()
+    while True:
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+        try:
+            await loop.run_in_executor(None, archive_old_posts, post_service.repository, post_service.cold_store)
+        except Exception as e:
+            print(f"Archival of old posts failed: {e}", file=sys.stderr)
+
+@app.on_event("startup")
+async def start_archival():
+    """
+    Starts the periodic archival job when ARCHIVE_INTERVAL_SECONDS and COLD_SEGMENT_DIR are set.
+    """
+    if ARCHIVE_INTERVAL_SECONDS > 0 and get_cold_store() is not None:
+        app.state.archive_task = asyncio.create_task(_archive_loop())
+
+async def _purge_loop():
+    # Periodically remove soft-deleted posts in small batches, off the event loop
+    loop = asyncio.get_running_loop()
+    repository = PostService().repository
+    while True:
+        await asyncio.sleep(PURGE_INTERVAL_SECONDS)
+        try:
+            purged = await loop.run_in_executor(None, repository.purge_deleted, PURGE_BATCH_SIZE)
+            if purged:
+                print(f"Purged {purged} soft-deleted posts", file=sys.stderr)
+        except Exception as e:
+            print(f"Purge of soft-deleted posts failed: {e}", file=sys.stderr)
+
+@app.on_event("startup")
+async def start_purge():
+    """
+    Starts the background purge of soft-deleted posts when POSTS_SOFT_DELETE is on.
+    """
+    if SOFT_DELETE:
+        app.state.purge_task = asyncio.create_task(_purge_loop())
+
+@app.get("/healthz")
+async def healthz():
+    """
+    Liveness probe. Returns 200 as soon as the worker is serving requests.
+    """
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness probe for the load balancer.
+
+    Returns:
+        200 with per-phase warmup timings (ms) once warmup has finished,
+        503 while warmup is still running.
+    """
+    if not warmup_state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "phases": warmup_state["phases"]})
+    return {"status": "ready", "phases": warmup_state["phases"], "total_ms": warmup_state["total_ms"]}
+
+@app.get("/metrics/admission")
+async def admission_metrics():
+    """
+    Admission control metrics: shared slot usage, and per route class the in-flight
+    requests, queue depth, admitted/rejected/timed-out counters and wait times.
+    """
+    return admission_stats()
+
 # --- API Endpoints ---
 
 @app.post("/signup", response_model=UserOut)
@@ -45,7 +171,7 @@ async def signup(
     Raises:
         HTTPException: If the email is already registered (400).
     """
-    return await user_service.signup(user_data)
+    return FastJSONResponse(await user_service.signup(user_data))
 
 @app.post("/login", response_model=UserOut)
 async def login(
@@ -64,7 +190,7 @@ async def login(
     Raises:
         HTTPException: If the credentials are invalid (401).
     """
-    return await user_service.login(user_data)
+    return FastJSONResponse(await user_service.login(user_data))
 
 @app.post("/posts", response_model=PostOut)
 async def create_post(
@@ -78,6 +204,7 @@ async def create_post(
     Requires a valid JWT token in the 'token' header for authentication.
     Validates the post text payload size.
     Saves the post to the database.
+    Post IDs can exceed 2^53 with sharded storage; see PostOut for how JavaScript clients must parse them.
 
     Args:
         post_data (PostCreate): The post data (text).
@@ -90,20 +217,27 @@ async def create_post(
     Raises:
         HTTPException: If the token is invalid/missing (401), or if the post content is too large (400).
     """
-    return await post_service.add_post(post_data, token)
+    return FastJSONResponse(await post_service.add_post(post_data, token))
 
 @app.get("/posts", response_model=list[PostOut])
 async def get_posts(
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
     token: str = Header(...),
     post_service: PostService = Depends(get_post_service)
 ):
     """
-    Retrieves all posts for the authenticated user.
+    Retrieves the posts of the authenticated user, optionally one page at a time.
 
     Requires a valid JWT token in the 'token' header for authentication.
     Uses in-memory caching for responses for up to 5 minutes per user.
+    Archived posts are included transparently once a page (limit) goes past the recent (hot) posts;
+    without a limit only the hot posts are returned.
+    Post IDs can exceed 2^53 with sharded storage; see PostOut for how JavaScript clients must parse them.
 
     Args:
+        limit (int, optional): Maximum number of posts to return; all hot posts if omitted.
+        offset (int): Number of posts to skip (default 0).
         token (str): The JWT token from the request header.
         post_service (PostService): Dependency injected PostService instance.
 
@@ -113,7 +247,7 @@ async def get_posts(
     Raises:
         HTTPException: If the token is invalid/missing (401).
     """
-    return await post_service.get_posts(token)
+    return FastJSONResponse(await post_service.get_posts(token, limit, offset))
 
 @app.delete("/posts/{post_id}")
 async def delete_post(
@@ -125,6 +259,7 @@ async def delete_post(
     Deletes a specific post for the authenticated user.
 
     Requires a valid JWT token in the 'token' header for authentication.
+    The ID must be passed exactly; with sharded storage it can exceed 2^53 (see PostOut).
 
     Args:
         post_id (int): The ID of the post to delete.
@@ -138,3 +273,79 @@ async def delete_post(
         HTTPException: If the token is invalid/missing (401), or if the post is not found or doesn't belong to the user (404).
     """
     return await post_service.delete_post(post_id, token)
+
+@app.post("/follow/{user_id}")
+async def follow_user(
+    user_id: int,
+    token: str = Header(...),
+    timeline_service: TimelineService = Depends(get_timeline_service)
+):
+    """
+    Follows another user.
+
+    Requires a valid JWT token in the 'token' header for authentication.
+    The followed user's posts appear in the authenticated user's timeline.
+
+    Args:
+        user_id (int): The ID of the user to follow.
+        token (str): The JWT token from the request header.
+        timeline_service (TimelineService): Dependency injected TimelineService instance.
+
+    Returns:
+        dict: A confirmation message.
+
+    Raises:
+        HTTPException: If the token is invalid/missing (401), if users try to follow themselves (400),
+                       or if the user to follow does not exist (404).
+    """
+    return await timeline_service.follow(user_id, token)
+
+@app.delete("/follow/{user_id}")
+async def unfollow_user(
+    user_id: int,
+    token: str = Header(...),
+    timeline_service: TimelineService = Depends(get_timeline_service)
+):
+    """
+    Unfollows a user.
+
+    Requires a valid JWT token in the 'token' header for authentication.
+
+    Args:
+        user_id (int): The ID of the user to unfollow.
+        token (str): The JWT token from the request header.
+        timeline_service (TimelineService): Dependency injected TimelineService instance.
+
+    Returns:
+        dict: A confirmation message.
+
+    Raises:
+        HTTPException: If the token is invalid/missing (401), or if the user is not followed (404).
+    """
+    return await timeline_service.unfollow(user_id, token)
+
+@app.get("/timeline", response_model=list[PostOut])
+async def get_timeline(
+    limit: int = 50,
+    token: str = Header(...),
+    timeline_service: TimelineService = Depends(get_timeline_service)
+):
+    """
+    Retrieves the home timeline of the authenticated user.
+
+    Requires a valid JWT token in the 'token' header for authentication.
+    Served from a precomputed per-user timeline filled when followed users post.
+    Post IDs can exceed 2^53 with sharded storage; see PostOut for how JavaScript clients must parse them.
+
+    Args:
+        limit (int): The maximum number of posts to return (default 50).
+        token (str): The JWT token from the request header.
+        timeline_service (TimelineService): Dependency injected TimelineService instance.
+
+    Returns:
+        list[PostOut]: Posts of followed users, ordered by creation date (latest first).
+
+    Raises:
+        HTTPException: If the token is invalid/missing (401).
+    """
+    return FastJSONResponse(await timeline_service.get_timeline(token, limit))
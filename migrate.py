@@ -0,0 +1,91 @@
+import argparse
+from sqlalchemy import BigInteger, inspect
+
+# --- Schema Migrations ---
+#
+# init_db.py (create_all) only creates missing tables; it never changes existing
+# ones. Changes to existing tables are applied here. Each migration checks the
+# live schema and only returns statements for what is missing, so the script
+# can be re-run safely:
+#
+#   python migrate.py                       # all configured post databases
+#   python migrate.py --url sqlite:///./posts.db
+
+def _add_deleted_at(inspector, dialect: str) -> list[str]:
+    # Soft delete (POSTS_SOFT_DELETE)
+    if "deleted_at" in {column["name"] for column in inspector.get_columns("posts")}:
+        return []
+    return [
+        "ALTER TABLE posts ADD COLUMN deleted_at DATETIME NULL",
+        "CREATE INDEX ix_posts_deleted_at ON posts (deleted_at)",
+    ]
+
+def _widen_post_ids(inspector, dialect: str) -> list[str]:
+    # Snowflake IDs (sharded storage) need 64 bits. SQLite's INTEGER primary key already has them.
+    if dialect != "mysql":
+        return []
+    id_column = next(column for column in inspector.get_columns("posts") if column["name"] == "id")
+    if isinstance(id_column["type"], BigInteger):
+        return []
+    return ["ALTER TABLE posts MODIFY id BIGINT NOT NULL AUTO_INCREMENT"]
+
+def _index_post_user_ids(inspector, dialect: str) -> list[str]:
+    # posts.user_id lost its foreign key (shard databases don't hold the users table)
+    # and needs an index of its own for list_by_user
+    statements = []
+    if dialect == "mysql": # SQLite can't drop a constraint in place, and doesn't enforce it by default
+        for foreign_key in inspector.get_foreign_keys("posts"):
+            if foreign_key["constrained_columns"] == ["user_id"]:
+                statements.append(f"ALTER TABLE posts DROP FOREIGN KEY {foreign_key['name']}")
+    if "ix_posts_user_id" not in {index["name"] for index in inspector.get_indexes("posts")}:
+        statements.append("CREATE INDEX ix_posts_user_id ON posts (user_id)")
+    return statements
+
+# (table, name, function returning the statements still needed for a schema)
+MIGRATIONS = [
+    ("posts", "posts.deleted_at", _add_deleted_at),
+    ("posts", "posts.id BIGINT", _widen_post_ids),
+    ("posts", "posts.user_id index", _index_post_user_ids),
+]
+
+def migrate(engine) -> list[str]:
+    """
+    Applies the pending migrations to a database.
+
+    Args:
+        engine (Engine): The database to migrate.
+
+    Returns:
+        list[str]: The names of the migrations that were applied.
+    """
+    applied = []
+    for table, name, pending_statements in MIGRATIONS:
+        inspector = inspect(engine) # Fresh per migration: earlier ones may have changed the schema
+        if not inspector.has_table(table):
+            continue # Table not created yet
+        statements = pending_statements(inspector, engine.dialect.name)
+        if not statements:
+            continue
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+        applied.append(name)
+    return applied
+
+if __name__ == "__main__":
+    from db import SQLALCHEMY_DATABASE_URL, create_db_engine
+    from repositories.factory import POST_SHARD_URLS, POST_SQLITE_URL, POST_STORAGE_BACKEND
+
+    parser = argparse.ArgumentParser(description="Apply schema changes to existing tables.")
+    parser.add_argument("--url", action="append",
+                        help="Database URL to migrate (repeatable). Defaults to the primary database and the configured post databases.")
+    args = parser.parse_args()
+
+    urls = [SQLALCHEMY_DATABASE_URL]
+    if POST_STORAGE_BACKEND == "sqlite":
+        urls.append(POST_SQLITE_URL)
+    elif POST_STORAGE_BACKEND == "sharded":
+        urls.extend(POST_SHARD_URLS)
+    for url in args.url or dict.fromkeys(urls):
+        applied = migrate(create_db_engine(url))
+        print(f"{url}: {', '.join(applied) if applied else 'up to date'}")
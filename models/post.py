@@ -1,11 +1,18 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from database import Base
 
 class Post(Base):
     __tablename__ = "posts"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    # BIGINT so globally unique (sharded) post IDs fit; SQLite keeps INTEGER for autoincrement.
+    # Existing tables get this, the user_id index and deleted_at from migrate.py.
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True)
+    # No foreign key: when sharded, posts live in databases that don't hold the users table
+    user_id = Column(Integer, index=True)
     text = Column(Text)
-    created_at = Column(DateTime, default=func.now()) 
\ No newline at end of file
+    created_at = Column(DateTime, default=func.now())
+    # Set when soft-deleted (POSTS_SOFT_DELETE), purged later. Deferred and only
+    # referenced in soft-delete mode, so tables without the column (see migrate.py) keep working.
+    deleted_at = deferred(Column(DateTime, nullable=True, index=True))
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer
+from database import Base
+
+class ShardDirectory(Base):
+    __tablename__ = "post_shard_directory"
+
+    # Users without an entry live on the shard chosen by hashing their ID
+    user_id = Column(Integer, primary_key=True)
+    shard = Column(Integer, nullable=False)
+    # Set while the user's posts are being moved from this shard to `shard`
+    migrating_from = Column(Integer, nullable=True)
@@ -0,0 +1,193 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import NamedTuple
+from schemas.post import PostOut
+
+# --- Post Record ---
+
+class PostRecord:
+    """
+    Compact in-memory representation of a single post.
+
+    Uses __slots__ so each record carries no per-instance __dict__, and stores
+    the creation time as an epoch float instead of a full datetime object.
+    Pydantic PostOut objects are only built from these records at the response
+    boundary (see PostRecord.to_post_out).
+    """
+    __slots__ = ("id", "user_id", "text", "created_ts")
+
+    def __init__(self, id: int, user_id: int, text: str, created_ts: float):
+        self.id = id
+        self.user_id = user_id
+        self.text = text
+        self.created_ts = created_ts
+
+    @property
+    def created_at(self) -> datetime:
+        """
+        The creation timestamp as a (naive, local time) datetime.
+        """
+        return datetime.fromtimestamp(self.created_ts)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the record as a PostOut-shaped dict (same field order), for serializing without validation.
+        """
+        return {"text": self.text, "id": self.id, "user_id": self.user_id, "created_at": self.created_at}
+
+    def to_post_out(self) -> PostOut:
+        """
+        Builds the PostOut response schema for this record.
+        """
+        return PostOut(id=self.id, user_id=self.user_id, text=self.text, created_at=self.created_at)
+
+    def to_ref(self) -> "PostRef":
+        """
+        Returns a PostRef pointing at this record.
+        """
+        return PostRef(self.id, self.user_id, self.created_ts)
+
+class PostRef(NamedTuple):
+    """
+    Pointer to a post without its text, e.g. an entry of a precomputed timeline.
+
+    Carries the author (which locates the post's shard) and the creation time
+    (which orders timelines) so posts can be fetched back with PostRepository.get_many.
+    """
+    id: int
+    user_id: int
+    created_ts: float
+
+# --- Repository Interface ---
+
+class PostRepository(ABC):
+    """
+    Storage interface that PostService depends on.
+
+    Implementations only deal with persistence; authentication, validation,
+    caching and logging stay in PostService.
+    """
+
+    @abstractmethod
+    def add(self, user_id: int, text: str) -> PostRecord:
+        """
+        Stores a new post for a user.
+
+        Args:
+            user_id (int): The ID of the post's author.
+            text (str): The content of the post.
+
+        Returns:
+            PostRecord: The stored post, including its generated ID and creation time.
+        """
+
+    @abstractmethod
+    def list_by_user(self, user_id: int, limit: int = None) -> list[PostRecord]:
+        """
+        Returns the posts of a user, ordered by creation date (latest first).
+
+        Args:
+            user_id (int): The ID of the user whose posts are returned.
+            limit (int, optional): Maximum number of (most recent) posts to return; all posts if None.
+
+        Returns:
+            list[PostRecord]: The user's posts.
+        """
+
+    @abstractmethod
+    def delete(self, post_id: int, user_id: int) -> bool:
+        """
+        Deletes a post if it exists and belongs to the given user.
+
+        Args:
+            post_id (int): The ID of the post to delete.
+            user_id (int): The ID of the user who must own the post.
+
+        Returns:
+            bool: True if a post was deleted, False if no matching post exists.
+        """
+
+    @abstractmethod
+    def get_many(self, refs: list[PostRef]) -> list[PostRecord]:
+        """
+        Fetches the posts that `refs` point to.
+
+        Args:
+            refs (list[PostRef]): The posts to fetch.
+
+        Returns:
+            list[PostRecord]: The posts that still exist, in no particular order.
+                Deleted posts are left out.
+        """
+
+    def top_authors(self, limit: int) -> list[int]:
+        """
+        Returns the IDs of the users with the most posts.
+
+        This ranks every author (a full scan on SQL backends); use recent_authors on hot paths.
+        Backends that cannot answer this cheaply may return an empty list.
+
+        Args:
+            limit (int): The maximum number of user IDs to return.
+
+        Returns:
+            list[int]: User IDs, most posts first.
+        """
+        return []
+
+    def recent_authors(self, limit: int, window: int) -> list[int]:
+        """
+        Returns the IDs of the users with the most posts among the `window` newest posts,
+        used to preload the cache on startup.
+
+        The cost is bounded by `window`, not by the size of the store.
+        Backends that cannot answer this cheaply may return an empty list.
+
+        Args:
+            limit (int): The maximum number of user IDs to return.
+            window (int): The number of newest posts to rank authors by.
+
+        Returns:
+            list[int]: User IDs, most recent posts first.
+        """
+        return []
+
+    def purge_deleted(self, batch_size: int) -> int:
+        """
+        Permanently removes soft-deleted posts (see POSTS_SOFT_DELETE).
+
+        Backends that delete immediately have nothing to purge and return 0.
+
+        Args:
+            batch_size (int): The maximum number of posts removed per transaction.
+
+        Returns:
+            int: The number of posts removed.
+        """
+        return 0
+
+    # --- Archival (age-based tiering) ---
+
+    @abstractmethod
+    def users_with_posts_older_than(self, cutoff_ts: float) -> list[int]:
+        """
+        Returns the IDs of users that have posts created before `cutoff_ts` (epoch seconds).
+        """
+
+    @abstractmethod
+    def list_older_than(self, user_id: int, cutoff_ts: float) -> list[PostRecord]:
+        """
+        Returns a user's posts created before `cutoff_ts` (epoch seconds), latest first.
+        """
+
+    @abstractmethod
+    def delete_archived(self, user_id: int, post_ids: set[int]) -> set[int]:
+        """
+        Deletes the given posts of a user once they have been archived.
+
+        Only the listed posts are deleted, never posts written after they were listed.
+
+        Returns:
+            set[int]: The IDs actually deleted. Posts missing from the result were
+                      already deleted (e.g. by their author) after being listed.
+        """
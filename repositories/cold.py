@@ -0,0 +1,236 @@
+from contextlib import contextmanager
+import fcntl
+import heapq
+import mmap
+import os
+import struct
+import time
+import zlib
+from itertools import islice
+from repositories.base import PostRecord
+
+# --- Cold Tier Configuration ---
+
+# Directory holding the archived (cold) post segments; the cold tier is disabled when empty
+COLD_SEGMENT_DIR = os.getenv("COLD_SEGMENT_DIR", "")
+
+# A user's segments are merged into one (dropping tombstoned posts) once there are more than this
+COLD_MAX_SEGMENTS = int(os.getenv("COLD_MAX_SEGMENTS", "8"))
+
+# --- Segment Format ---
+#
+# Each segment is an immutable file holding some of one user's archived posts:
+#
+#   header   MAGIC, entry count
+#   index    one ENTRY per post, sorted by (created_ts, id) descending
+#   data     post texts, each zlib-compressed unless that doesn't make it smaller
+#
+# The index is indexed by (user_id, created_at): the user is given by the
+# segment's directory and entries are ordered by creation time, so a page of
+# posts only decompresses the texts it returns.
+
+MAGIC = b"PSEG0001"
+HEADER = struct.Struct("<8sI")
+ENTRY = struct.Struct("<dqQIB") # created_ts, post id, data offset, data length, compressed flag
+
+class ColdSegmentStore:
+    """
+    Archive of old posts in compressed, immutable per-user segment files, read via mmap.
+
+    Posts deleted after archival are recorded in a per-user tombstone file.
+    Each archival run adds a segment, so once a user has more than
+    COLD_MAX_SEGMENTS they are compacted into one and the tombstones folded in.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _user_dir(self, user_id: int) -> str:
+        # Fan users out over subdirectories to keep directory sizes manageable
+        return os.path.join(self.directory, f"{user_id % 1000:03d}", str(user_id))
+
+    def _segment_paths(self, user_id: int) -> list[str]:
+        user_dir = self._user_dir(user_id)
+        if not os.path.isdir(user_dir):
+            return []
+        return [os.path.join(user_dir, name) for name in sorted(os.listdir(user_dir)) if name.endswith(".seg")]
+
+    @contextmanager
+    def _locked(self, user_id: int):
+        # Tombstone writes and compaction may run in different processes (API workers, archive_posts.py)
+        user_dir = self._user_dir(user_id)
+        os.makedirs(user_dir, exist_ok=True)
+        with open(os.path.join(user_dir, "lock"), "wb") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def write_segment(self, user_id: int, posts: list[PostRecord]) -> int:
+        """
+        Writes a new segment holding `posts` and returns its size in bytes.
+
+        The file is written under a temporary name and renamed into place, so
+        readers never see a partial segment. Compacts the user's segments if
+        there are now more than COLD_MAX_SEGMENTS.
+        """
+        size = self._write(user_id, posts)
+        if len(self._segment_paths(user_id)) > COLD_MAX_SEGMENTS:
+            self.compact(user_id)
+        return size
+
+    def _write(self, user_id: int, posts: list[PostRecord]) -> int:
+        posts = sorted(posts, key=lambda post: (post.created_ts, post.id), reverse=True)
+        index = []
+        blobs = []
+        offset = HEADER.size + ENTRY.size * len(posts)
+        for post in posts:
+            raw = post.text.encode()
+            compressed = zlib.compress(raw)
+            is_compressed = len(compressed) < len(raw)
+            blob = compressed if is_compressed else raw
+            index.append(ENTRY.pack(post.created_ts, post.id, offset, len(blob), is_compressed))
+            blobs.append(blob)
+            offset += len(blob)
+
+        user_dir = self._user_dir(user_id)
+        os.makedirs(user_dir, exist_ok=True)
+        path = os.path.join(user_dir, f"{time.time_ns()}.seg")
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as segment:
+            segment.write(HEADER.pack(MAGIC, len(posts)))
+            segment.writelines(index)
+            segment.writelines(blobs)
+        os.replace(temporary_path, path)
+        return offset
+
+    def _read_index(self, segment: mmap.mmap) -> list[tuple]:
+        magic, count = HEADER.unpack_from(segment, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a post segment file")
+        return list(ENTRY.iter_unpack(segment[HEADER.size:HEADER.size + ENTRY.size * count]))
+
+    def tombstones(self, user_id: int) -> set[int]:
+        """
+        Returns the IDs of archived posts of a user that have been deleted.
+        """
+        path = os.path.join(self._user_dir(user_id), "tombstones")
+        if not os.path.exists(path):
+            return set()
+        with open(path, "rb") as tombstone_file:
+            data = tombstone_file.read()
+        return set(struct.unpack(f"<{len(data) // 8}q", data))
+
+    def compact(self, user_id: int) -> int:
+        """
+        Merges all of a user's segments into one, dropping tombstoned posts, and clears the tombstones.
+
+        The merged segment is in place before the old ones are removed, so readers
+        never miss a post; readers that still have an old segment open keep reading it.
+
+        Returns:
+            int: The number of segments merged.
+        """
+        with self._locked(user_id):
+            paths = self._segment_paths(user_id)
+            tombstones = self.tombstones(user_id)
+            if len(paths) < 2 and not tombstones:
+                return 0
+            posts = self._read_posts(user_id, paths, tombstones, 0, None)
+            if posts:
+                self._write(user_id, posts)
+            for path in paths:
+                os.remove(path)
+            if tombstones:
+                os.remove(os.path.join(self._user_dir(user_id), "tombstones"))
+        return len(paths)
+
+    def list_by_user(self, user_id: int, offset: int = 0, limit: int = None, exclude_ids=frozenset()) -> list[PostRecord]:
+        """
+        Returns a page of a user's archived posts, latest first.
+
+        Args:
+            user_id (int): The ID of the user whose posts are returned.
+            offset (int): Number of archived posts to skip.
+            limit (int, optional): Maximum number of posts to return; all remaining if None.
+            exclude_ids (set[int]): Post IDs to skip, e.g. posts still present in the hot store.
+
+        Returns:
+            list[PostRecord]: The requested posts.
+        """
+        while True:
+            try:
+                # Tombstones first: a compaction that removes them has already dropped their posts
+                skipped = self.tombstones(user_id) | set(exclude_ids)
+                paths = self._segment_paths(user_id)
+                if not paths:
+                    return []
+                return self._read_posts(user_id, paths, skipped, offset, limit)
+            except FileNotFoundError:
+                # A compaction removed files after they were listed; list them again
+                continue
+
+    def _read_posts(self, user_id: int, paths: list[str], skipped: set[int], offset: int, limit: int) -> list[PostRecord]:
+        files = []
+        segments = []
+        try:
+            indexes = []
+            for number, path in enumerate(paths):
+                segment_file = open(path, "rb")
+                files.append(segment_file)
+                segment = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+                segments.append(segment)
+                # Tag entries with their segment number so texts can be read after merging
+                indexes.append([(*entry, number) for entry in self._read_index(segment)])
+
+            merged = heapq.merge(*indexes, key=lambda entry: (entry[0], entry[1]), reverse=True)
+            visible = (entry for entry in _unique(merged) if entry[1] not in skipped)
+            page = islice(visible, offset, None if limit is None else offset + limit)
+
+            posts = []
+            for created_ts, post_id, data_offset, length, is_compressed, number in page:
+                blob = segments[number][data_offset:data_offset + length]
+                text = (zlib.decompress(blob) if is_compressed else blob).decode()
+                posts.append(PostRecord(post_id, user_id, text, created_ts))
+            return posts
+        finally:
+            for segment in segments:
+                segment.close()
+            for segment_file in files:
+                segment_file.close()
+
+    def delete(self, post_id: int, user_id: int) -> bool:
+        """
+        Deletes an archived post by recording a tombstone. Returns False if no such post is archived.
+        """
+        if not self._segment_paths(user_id):
+            return False
+        # Under the user's lock, so a compaction can't drop the tombstone or the segment being checked
+        with self._locked(user_id):
+            if post_id in self.tombstones(user_id):
+                return False
+            for path in self._segment_paths(user_id):
+                with open(path, "rb") as segment_file, mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ) as segment:
+                    if any(entry[1] == post_id for entry in self._read_index(segment)):
+                        with open(os.path.join(self._user_dir(user_id), "tombstones"), "ab") as tombstone_file:
+                            tombstone_file.write(struct.pack("<q", post_id))
+                        return True
+        return False
+
+def _unique(entries):
+    # A reader can list segments between a compaction writing the merged segment and
+    # removing the ones it replaces, and then sees those posts twice (as neighbours)
+    last_id = None
+    for entry in entries:
+        if entry[1] != last_id:
+            yield entry
+        last_id = entry[1]
+
+_cold_store = None
+
+def get_cold_store():
+    """
+    Returns the process-wide cold segment store, or None if COLD_SEGMENT_DIR is not set.
+    """
+    global _cold_store
+    if _cold_store is None and COLD_SEGMENT_DIR:
+        _cold_store = ColdSegmentStore(COLD_SEGMENT_DIR)
+    return _cold_store
@@ -0,0 +1,159 @@
+import os
+import sys
+from repositories.base import PostRepository
+
+# --- Storage Backend Configuration ---
+
+# One of "memory", "sqlite", "mysql" or "sharded"
+POST_STORAGE_BACKEND = os.getenv("POST_STORAGE_BACKEND", "memory")
+
+# Database URL used by the "sqlite" backend
+POST_SQLITE_URL = os.getenv("POST_SQLITE_URL", "sqlite:///./posts.db")
+
+# Comma-separated shard database URLs used by the "sharded" backend
+# (e.g. "sqlite:///./shard0.db,sqlite:///./shard1.db" for local testing)
+POST_SHARD_URLS = [url for url in os.getenv("POST_SHARD_URLS", "").split(",") if url]
+
+# Database holding the shard directory; defaults to the first shard
+POST_SHARD_DIRECTORY_URL = os.getenv("POST_SHARD_DIRECTORY_URL", "")
+
+# Worker ID (0-1023) embedded in generated post IDs. Required by the "sharded" backend
+# and must be unique across all processes on all hosts, or post IDs can collide
+# (so run one uvicorn process per worker ID rather than using --workers).
+POST_ID_WORKER_ID = os.getenv("POST_ID_WORKER_ID", "")
+
+_repository = None
+_follow_repository = None
+_sqlite_session_factory = None
+
+def _session_factory(backend: str):
+    """
+    Returns the SQLAlchemy session factory for a SQL storage backend.
+    """
+    global _sqlite_session_factory
+    if backend in ("mysql", "sharded"):
+        from database import SessionLocal
+        return SessionLocal
+
+    if _sqlite_session_factory is None:
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from database import Base
+        from models.user import User
+        from models.post import Post
+        from models.follow import Follow
+        engine = create_engine(POST_SQLITE_URL, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        _sqlite_session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return _sqlite_session_factory
+
+def create_post_repository(backend: str) -> PostRepository:
+    """
+    Creates a new post repository for the given storage backend.
+
+    Args:
+        backend (str): The storage backend name ("memory", "sqlite", "mysql" or "sharded").
+
+    Returns:
+        PostRepository: A repository instance for the backend.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if backend == "memory":
+        from repositories.memory import MemoryPostRepository
+        return MemoryPostRepository()
+
+    if backend in ("sqlite", "mysql"):
+        from repositories.sql import SqlPostRepository
+        return SqlPostRepository(_session_factory(backend))
+
+    if backend == "sharded":
+        return create_sharded_post_repository()
+
+    raise ValueError(f"Unknown post storage backend: {backend}")
+
+def create_sharded_post_repository(for_writes: bool = True):
+    """
+    Creates a ShardedPostRepository over POST_SHARD_URLS, creating missing tables.
+
+    Args:
+        for_writes (bool): Whether the repository will add posts, which needs
+            POST_ID_WORKER_ID. Admin tools that only read or move posts pass False.
+
+    Returns:
+        ShardedPostRepository: A repository spreading posts over the shards.
+
+    Raises:
+        ValueError: If no shard URLs are configured, or if POST_ID_WORKER_ID is
+            missing or out of range when `for_writes` is set.
+    """
+    from sqlalchemy.orm import sessionmaker
+    from db import create_db_engine
+    from models.post import Post
+    from models.shard_directory import ShardDirectory
+    from repositories.sharded import ShardedPostRepository, SnowflakeIds
+
+    if not POST_SHARD_URLS:
+        raise ValueError("POST_SHARD_URLS must list at least one shard database")
+    id_generator = None
+    if for_writes:
+        if not POST_ID_WORKER_ID.isdigit():
+            raise ValueError("POST_ID_WORKER_ID must be set to a worker ID (0-1023) that is unique across all processes")
+        id_generator = SnowflakeIds(int(POST_ID_WORKER_ID))
+
+    shard_session_factories = []
+    for url in POST_SHARD_URLS:
+        engine = create_db_engine(url)
+        Post.__table__.create(bind=engine, checkfirst=True)
+        shard_session_factories.append(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+    directory_engine = create_db_engine(POST_SHARD_DIRECTORY_URL or POST_SHARD_URLS[0])
+    ShardDirectory.__table__.create(bind=directory_engine, checkfirst=True)
+    directory_session_factory = sessionmaker(autocommit=False, autoflush=False, bind=directory_engine)
+
+    return ShardedPostRepository(shard_session_factories, directory_session_factory, id_generator)
+
+def create_follow_repository(backend: str):
+    """
+    Creates a new follow graph repository for the given storage backend.
+
+    With the "sharded" backend the follow graph stays in the main database.
+
+    Args:
+        backend (str): The storage backend name ("memory", "sqlite", "mysql" or "sharded").
+
+    Returns:
+        FollowRepository: A repository instance for the backend.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if backend == "memory":
+        from repositories.follows import MemoryFollowRepository
+        return MemoryFollowRepository()
+
+    if backend in ("sqlite", "mysql", "sharded"):
+        from repositories.follows import SqlFollowRepository
+        return SqlFollowRepository(_session_factory(backend))
+
+    raise ValueError(f"Unknown post storage backend: {backend}")
+
+def get_post_repository() -> PostRepository:
+    """
+    Returns the process-wide post repository selected by POST_STORAGE_BACKEND.
+    """
+    global _repository
+    if _repository is None:
+        print(f"Using '{POST_STORAGE_BACKEND}' post storage backend.", file=sys.stderr)
+        _repository = create_post_repository(POST_STORAGE_BACKEND)
+    return _repository
+
+def get_follow_repository():
+    """
+    Returns the process-wide follow graph repository selected by POST_STORAGE_BACKEND.
+    """
+    global _follow_repository
+    if _follow_repository is None:
+        _follow_repository = create_follow_repository(POST_STORAGE_BACKEND)
+    return _follow_repository
@@ -0,0 +1,154 @@
+import threading
+from abc import ABC, abstractmethod
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from db import mark_write, route_reads
+from models.follow import Follow
+
+# --- Follow Graph Interface ---
+
+class FollowRepository(ABC):
+    """
+    Storage interface for the follow graph (who follows whom).
+    """
+
+    @abstractmethod
+    def follow(self, follower_id: int, followee_id: int) -> bool:
+        """
+        Adds a follow edge. Returns False if it already existed.
+        """
+
+    @abstractmethod
+    def unfollow(self, follower_id: int, followee_id: int) -> bool:
+        """
+        Removes a follow edge. Returns False if it did not exist.
+        """
+
+    @abstractmethod
+    def followers(self, user_id: int) -> list[int]:
+        """
+        Returns the IDs of the users following `user_id`.
+        """
+
+    @abstractmethod
+    def followees(self, user_id: int) -> list[int]:
+        """
+        Returns the IDs of the users `user_id` follows.
+        """
+
+    @abstractmethod
+    def follower_count(self, user_id: int) -> int:
+        """
+        Returns the number of users following `user_id`.
+        """
+
+    @abstractmethod
+    def follower_counts(self, user_ids: list[int]) -> dict[int, int]:
+        """
+        Returns the number of followers of each of `user_ids` (users without followers may be left out).
+        """
+
+# --- In-Memory Follow Graph ---
+
+class MemoryFollowRepository(FollowRepository):
+    """
+    Process-local follow graph, stored as adjacency sets in both directions.
+    """
+
+    def __init__(self):
+        self._followers: dict[int, set[int]] = {}
+        self._followees: dict[int, set[int]] = {}
+        self._lock = threading.Lock()
+
+    def follow(self, follower_id: int, followee_id: int) -> bool:
+        with self._lock:
+            followees = self._followees.setdefault(follower_id, set())
+            if followee_id in followees:
+                return False
+            followees.add(followee_id)
+            self._followers.setdefault(followee_id, set()).add(follower_id)
+        return True
+
+    def unfollow(self, follower_id: int, followee_id: int) -> bool:
+        with self._lock:
+            followees = self._followees.get(follower_id, set())
+            if followee_id not in followees:
+                return False
+            followees.discard(followee_id)
+            self._followers.get(followee_id, set()).discard(follower_id)
+        return True
+
+    def followers(self, user_id: int) -> list[int]:
+        return list(self._followers.get(user_id, ()))
+
+    def followees(self, user_id: int) -> list[int]:
+        return list(self._followees.get(user_id, ()))
+
+    def follower_count(self, user_id: int) -> int:
+        return len(self._followers.get(user_id, ()))
+
+    def follower_counts(self, user_ids: list[int]) -> dict[int, int]:
+        return {user_id: len(self._followers.get(user_id, ())) for user_id in user_ids}
+
+# --- SQL Follow Graph ---
+
+class SqlFollowRepository(FollowRepository):
+    """
+    Follow graph stored in the `follows` table (SQLite or MySQL).
+    """
+
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+
+    def follow(self, follower_id: int, followee_id: int) -> bool:
+        with self._session_factory() as session:
+            try:
+                session.execute(insert(Follow).values(follower_id=follower_id, followee_id=followee_id))
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                # Only a duplicate edge means "already following"; anything else
+                # (e.g. a foreign key failure for an unknown user) is a real error.
+                existing = session.execute(
+                    select(Follow.follower_id).where(Follow.follower_id == follower_id, Follow.followee_id == followee_id)
+                ).first()
+                if existing is None:
+                    raise
+                return False
+        mark_write(f"user:{follower_id}")
+        return True
+
+    def unfollow(self, follower_id: int, followee_id: int) -> bool:
+        with self._session_factory() as session:
+            result = session.execute(
+                delete(Follow).where(Follow.follower_id == follower_id, Follow.followee_id == followee_id)
+            )
+            session.commit()
+        mark_write(f"user:{follower_id}")
+        return result.rowcount > 0
+
+    def followers(self, user_id: int) -> list[int]:
+        with self._session_factory() as session:
+            return list(session.execute(select(Follow.follower_id).where(Follow.followee_id == user_id)).scalars())
+
+    def followees(self, user_id: int) -> list[int]:
+        with self._session_factory() as session:
+            route_reads(session, f"user:{user_id}")
+            return list(session.execute(select(Follow.followee_id).where(Follow.follower_id == user_id)).scalars())
+
+    def follower_count(self, user_id: int) -> int:
+        with self._session_factory() as session:
+            return session.execute(
+                select(func.count()).select_from(Follow).where(Follow.followee_id == user_id)
+            ).scalar_one()
+
+    def follower_counts(self, user_ids: list[int]) -> dict[int, int]:
+        if not user_ids:
+            return {}
+        statement = (
+            select(Follow.followee_id, func.count().label("follower_count"))
+            .where(Follow.followee_id.in_(user_ids))
+            .group_by(Follow.followee_id)
+        )
+        with self._session_factory() as session:
+            return {row.followee_id: row.follower_count for row in session.execute(statement)}
@@ -0,0 +1,113 @@
+from bisect import bisect_left
+from collections import Counter
+import heapq
+from itertools import chain
+import threading
+import time
+from repositories.base import PostRecord, PostRef, PostRepository
+
+class MemoryPostRepository(PostRepository):
+    """
+    Process-local post storage.
+
+    Posts are indexed by user ID; each user's list is kept in insertion (= creation) order,
+    so reading a user's posts never scans other users' posts and never needs a sort.
+    """
+
+    def __init__(self):
+        self._posts: dict[int, list[PostRecord]] = {}
+        self._next_post_id = 1
+        self._lock = threading.Lock()
+
+    def add(self, user_id: int, text: str) -> PostRecord:
+        with self._lock:
+            record = PostRecord(self._next_post_id, user_id, text, time.time())
+            self._posts.setdefault(user_id, []).append(record)
+            self._next_post_id += 1
+        return record
+
+    def bulk_load(self, rows) -> int:
+        """
+        Loads many posts at once, e.g. to seed the store for benchmarks.
+
+        Args:
+            rows (iterable[dict]): Posts with "user_id", "text", "created_at" (datetime) and optionally "id".
+
+        Returns:
+            int: The number of posts loaded.
+        """
+        count = 0
+        touched = set()
+        with self._lock:
+            for row in rows:
+                post_id = row.get("id") or self._next_post_id
+                record = PostRecord(post_id, row["user_id"], row["text"], row["created_at"].timestamp())
+                self._posts.setdefault(record.user_id, []).append(record)
+                self._next_post_id = max(self._next_post_id, post_id + 1)
+                touched.add(record.user_id)
+                count += 1
+            # Keep each user's list in creation order, which list_by_user relies on
+            for user_id in touched:
+                self._posts[user_id].sort(key=lambda post: (post.created_ts, post.id))
+        return count
+
+    def list_by_user(self, user_id: int, limit: int = None) -> list[PostRecord]:
+        # The per-user list is in creation order, so reversing it gives latest first
+        posts = self._posts.get(user_id, [])
+        if limit is not None:
+            posts = posts[max(len(posts) - limit, 0):]
+        return list(reversed(posts))
+
+    def delete(self, post_id: int, user_id: int) -> bool:
+        with self._lock:
+            user_posts = self._posts.get(user_id, [])
+            for i, post in enumerate(user_posts):
+                if post.id == post_id:
+                    del user_posts[i]
+                    return True
+        return False
+
+    def get_many(self, refs: list[PostRef]) -> list[PostRecord]:
+        wanted: dict[int, list[PostRef]] = {}
+        for ref in refs:
+            wanted.setdefault(ref.user_id, []).append(ref)
+        found = []
+        with self._lock:
+            for user_id, user_refs in wanted.items():
+                posts = self._posts.get(user_id, [])
+                ids = {ref.id for ref in user_refs}
+                # Lists are in creation order: only posts created since the oldest wanted one can match
+                start = bisect_left(posts, min(ref.created_ts for ref in user_refs), key=lambda post: post.created_ts)
+                found.extend(post for post in posts[start:] if post.id in ids)
+        return found
+
+    def top_authors(self, limit: int) -> list[int]:
+        # Snapshot under the lock: add() may insert users while this runs in another thread
+        with self._lock:
+            counts = [(user_id, len(posts)) for user_id, posts in self._posts.items()]
+        counts.sort(key=lambda item: item[1], reverse=True)
+        return [user_id for user_id, count in counts[:limit] if count]
+
+    def recent_authors(self, limit: int, window: int) -> list[int]:
+        # Only each user's last `window` posts can be among the `window` newest overall
+        with self._lock:
+            candidates = [posts[-window:] for posts in self._posts.values()]
+        newest = heapq.nlargest(window, chain.from_iterable(candidates), key=lambda post: post.id)
+        return [user_id for user_id, _ in Counter(post.user_id for post in newest).most_common(limit)]
+
+    def users_with_posts_older_than(self, cutoff_ts: float) -> list[int]:
+        with self._lock:
+            return [user_id for user_id, posts in self._posts.items() if posts and posts[0].created_ts < cutoff_ts]
+
+    def list_older_than(self, user_id: int, cutoff_ts: float) -> list[PostRecord]:
+        with self._lock:
+            posts = self._posts.get(user_id, [])
+            older = posts[:bisect_left(posts, cutoff_ts, key=lambda post: post.created_ts)]
+        return list(reversed(older))
+
+    def delete_archived(self, user_id: int, post_ids: set[int]) -> set[int]:
+        with self._lock:
+            posts = self._posts.get(user_id, [])
+            deleted = {post.id for post in posts if post.id in post_ids}
+            posts[:] = [post for post in posts if post.id not in post_ids]
+        return deleted
@@ -0,0 +1,292 @@
+import heapq
+import os
+from collections import Counter
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import mysql, sqlite
+from models.post import Post
+from models.shard_directory import ShardDirectory
+from repositories.base import PostRecord, PostRef, PostRepository
+from repositories.sql import SqlPostRepository, visible
+
+# --- Sharding Configuration ---
+
+# How long (seconds) workers cache directory entries. The resharding tool waits
+# longer than this between steps so every worker sees each state change.
+SHARD_DIRECTORY_TTL = float(os.getenv("SHARD_DIRECTORY_TTL", "5"))
+
+# --- Globally Unique Post IDs ---
+
+class SnowflakeIds:
+    """
+    Generates 64-bit, time-ordered IDs that are unique across shards and workers.
+
+    Layout: 41 bits of milliseconds since 2024-01-01, 10 bits of worker ID and
+    12 bits of per-millisecond sequence. IDs never change when a user's posts
+    are moved to another shard.
+    """
+    EPOCH_MS = 1704067200000
+
+    def __init__(self, worker_id: int):
+        if not 0 <= worker_id <= 0x3FF:
+            raise ValueError(f"Worker ID must be between 0 and 1023, got {worker_id}")
+        self._worker_id = worker_id
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            now_ms = int(time.time() * 1000)
+            if now_ms <= self._last_ms:
+                self._sequence = (self._sequence + 1) & 0xFFF
+                if self._sequence == 0:
+                    # Sequence exhausted for this millisecond; move to the next one
+                    self._last_ms += 1
+                now_ms = self._last_ms
+            else:
+                self._sequence = 0
+                self._last_ms = now_ms
+            return ((now_ms - self.EPOCH_MS) << 22) | (self._worker_id << 12) | self._sequence
+
+# --- Sharded Post Storage ---
+
+class ShardedPostRepository(PostRepository):
+    """
+    Spreads posts over several databases (shards) by user ID.
+
+    A user's posts all live on one shard: the one recorded for the user in the
+    shard directory, or otherwise crc32(user_id) % number of shards. Directory
+    entries are written by the resharding tool (see reshard.py) and can mark a
+    user as migrating, in which case writes go to the new shard while reads merge
+    both shards until the move completes.
+
+    Note that changing the number of shards changes the hash placement of every
+    user without a directory entry, so shards should only be added together with
+    directory entries that pin existing users.
+    """
+
+    def __init__(self, shard_session_factories: list, directory_session_factory, id_generator: SnowflakeIds = None):
+        self.shard_session_factories = shard_session_factories
+        self.directory_session_factory = directory_session_factory
+        self.id_generator = id_generator
+        self.shards = [SqlPostRepository(factory, id_generator) for factory in shard_session_factories]
+        self._directory_cache = TTLCache(maxsize=100000, ttl=SHARD_DIRECTORY_TTL)
+        self._executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="shard")
+
+    def hash_shard(self, user_id: int) -> int:
+        """
+        Returns the shard a user is placed on when they have no directory entry.
+        """
+        return zlib.crc32(str(user_id).encode()) % len(self.shards)
+
+    def locate(self, user_id: int) -> tuple:
+        """
+        Returns (shard, migrating_from) for a user; migrating_from is None unless the user is being moved.
+        """
+        if user_id in self._directory_cache:
+            return self._directory_cache[user_id]
+        with self.directory_session_factory() as session:
+            entry = session.get(ShardDirectory, user_id)
+            location = (entry.shard, entry.migrating_from) if entry else (self.hash_shard(user_id), None)
+        self._directory_cache[user_id] = location
+        return location
+
+    def add(self, user_id: int, text: str) -> PostRecord:
+        if self.id_generator is None:
+            # Per-shard autoincrement IDs would collide across shards
+            raise RuntimeError("Adding posts to sharded storage requires an ID generator (POST_ID_WORKER_ID)")
+        shard, _ = self.locate(user_id)
+        return self.shards[shard].add(user_id, text)
+
+    def list_by_user(self, user_id: int, limit: int = None) -> list[PostRecord]:
+        shard, migrating_from = self.locate(user_id)
+        posts = self.shards[shard].list_by_user(user_id, limit)
+        if migrating_from is None:
+            return posts
+        # Mid-move: the old shard may still hold posts that haven't been copied yet
+        copied = {post.id for post in posts}
+        posts.extend(post for post in self.shards[migrating_from].list_by_user(user_id, limit) if post.id not in copied)
+        posts.sort(key=lambda post: (post.created_ts, post.id), reverse=True)
+        return posts[:limit]
+
+    def delete(self, post_id: int, user_id: int) -> bool:
+        shard, migrating_from = self.locate(user_id)
+        deleted = self.shards[shard].delete(post_id, user_id)
+        if migrating_from is not None:
+            deleted = self.shards[migrating_from].delete(post_id, user_id) or deleted
+        return deleted
+
+    def get_many(self, refs: list[PostRef]) -> list[PostRecord]:
+        # Group the refs by the shard(s) holding their author; mid-move authors are looked up on both
+        per_shard: dict[int, list[PostRef]] = {}
+        for ref in refs:
+            shard, migrating_from = self.locate(ref.user_id)
+            per_shard.setdefault(shard, []).append(ref)
+            if migrating_from is not None:
+                per_shard.setdefault(migrating_from, []).append(ref)
+        found = {}
+        for shard, shard_refs in per_shard.items():
+            for post in self.shards[shard].get_many(shard_refs):
+                found[post.id] = post
+        return list(found.values())
+
+    def top_authors(self, limit: int) -> list[int]:
+        # Each user lives on one shard, so the global top `limit` is among the per-shard
+        # top `limit`s; counts are summed in case a user is mid-move between two shards.
+        counts = Counter()
+        for ranked in self._scatter(lambda shard: shard.top_author_counts(limit)):
+            counts.update(dict(ranked))
+        return [user_id for user_id, _ in counts.most_common(limit)]
+
+    def recent_authors(self, limit: int, window: int) -> list[int]:
+        # Per-shard windows of the newest posts; snowflake IDs are time-ordered on every shard
+        counts = Counter()
+        for ranked in self._scatter(lambda shard: shard.recent_author_counts(limit, window)):
+            counts.update(dict(ranked))
+        return [user_id for user_id, _ in counts.most_common(limit)]
+
+    def users_with_posts_older_than(self, cutoff_ts: float) -> list[int]:
+        per_shard = self._scatter(lambda shard: shard.users_with_posts_older_than(cutoff_ts))
+        return sorted({user_id for user_ids in per_shard for user_id in user_ids})
+
+    def list_older_than(self, user_id: int, cutoff_ts: float) -> list[PostRecord]:
+        shard, migrating_from = self.locate(user_id)
+        posts = self.shards[shard].list_older_than(user_id, cutoff_ts)
+        if migrating_from is not None:
+            copied = {post.id for post in posts}
+            posts.extend(post for post in self.shards[migrating_from].list_older_than(user_id, cutoff_ts) if post.id not in copied)
+            posts.sort(key=lambda post: (post.created_ts, post.id), reverse=True)
+        return posts
+
+    def delete_archived(self, user_id: int, post_ids: set[int]) -> set[int]:
+        shard, migrating_from = self.locate(user_id)
+        deleted = self.shards[shard].delete_archived(user_id, post_ids)
+        if migrating_from is not None:
+            deleted |= self.shards[migrating_from].delete_archived(user_id, post_ids)
+        return deleted
+
+    def purge_deleted(self, batch_size: int) -> int:
+        return sum(self._scatter(lambda shard: shard.purge_deleted(batch_size)))
+
+    # --- Cross-Shard (Admin) Queries ---
+
+    def _scatter(self, query) -> list:
+        """
+        Runs `query(shard_repository)` on every shard in parallel and returns the per-shard results.
+        """
+        return list(self._executor.map(query, self.shards))
+
+    def _scatter_sessions(self, query) -> list:
+        """
+        Runs `query(session)` against every shard in parallel and returns the per-shard results.
+        """
+        def run(factory):
+            with factory() as session:
+                return query(session)
+        return list(self._executor.map(run, self.shard_session_factories))
+
+    def count_posts(self) -> int:
+        """
+        Returns the total number of posts across all shards.
+        """
+        return sum(self._scatter_sessions(lambda session: session.execute(visible(select(func.count(Post.id)))).scalar_one()))
+
+    def recent_posts(self, limit: int) -> list[PostRecord]:
+        """
+        Returns the newest posts across all shards, newest first.
+        """
+        statement = visible(
+            select(Post.id, Post.user_id, Post.text, Post.created_at)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit)
+        )
+        per_shard = self._scatter_sessions(lambda session: [
+            PostRecord(row.id, row.user_id, row.text, row.created_at.timestamp())
+            for row in session.execute(statement)
+        ])
+        merged = heapq.merge(*per_shard, key=lambda post: (post.created_ts, post.id), reverse=True)
+        return list(merged)[:limit]
+
+    # --- Online Resharding ---
+
+    def _set_directory(self, user_id: int, shard: int, migrating_from):
+        values = {"user_id": user_id, "shard": shard, "migrating_from": migrating_from}
+        with self.directory_session_factory() as session:
+            dialect = session.get_bind().dialect.name
+            if dialect == "mysql":
+                statement = mysql.insert(ShardDirectory).values(**values)
+                statement = statement.on_duplicate_key_update(shard=shard, migrating_from=migrating_from)
+            else:
+                statement = sqlite.insert(ShardDirectory).values(**values)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[ShardDirectory.user_id], set_={"shard": shard, "migrating_from": migrating_from}
+                )
+            session.execute(statement)
+            session.commit()
+        self._directory_cache.pop(user_id, None)
+
+    def move_user(self, user_id: int, target: int, batch_size: int = 1000, log=print) -> int:
+        """
+        Moves a user's posts to another shard while the service keeps running.
+
+        1. Mark the user as migrating: writes go to the target, reads merge both shards.
+        2. Copy the posts from the source shard to the target.
+        3. Point the directory at the target only.
+        4. Delete the posts from the source shard.
+
+        Args:
+            user_id (int): The ID of the user to move.
+            target (int): The index of the destination shard.
+            batch_size (int): Number of posts copied per INSERT.
+            log (callable): Receives progress messages.
+
+        Returns:
+            int: The number of posts copied.
+        """
+        source, migrating_from = self.locate(user_id)
+        if migrating_from is not None:
+            source = migrating_from # Resume an interrupted move
+        if source == target:
+            log(f"User {user_id} is already on shard {target}")
+            return 0
+
+        wait = SHARD_DIRECTORY_TTL + 1
+        self._set_directory(user_id, target, source)
+        log(f"User {user_id} marked as migrating {source} -> {target}; waiting {wait}s for workers")
+        time.sleep(wait)
+
+        columns = (Post.id, Post.user_id, Post.text, Post.created_at)
+        with self.shard_session_factories[source]() as session:
+            # Soft-deleted posts are left behind and removed with the source rows
+            rows = [dict(row._mapping) for row in session.execute(visible(select(*columns).where(Post.user_id == user_id)))]
+        with self.shard_session_factories[target]() as session:
+            present = set(session.execute(select(Post.id).where(Post.user_id == user_id)).scalars())
+            missing = [row for row in rows if row["id"] not in present]
+            for start in range(0, len(missing), batch_size):
+                session.execute(insert(Post), missing[start:start + batch_size])
+            session.commit()
+        log(f"Copied {len(missing)} posts of user {user_id} to shard {target}")
+
+        # Posts deleted from the source while copying must not come back on the target
+        with self.shard_session_factories[source]() as session:
+            remaining = set(session.execute(visible(select(Post.id).where(Post.user_id == user_id))).scalars())
+        resurrected = [row["id"] for row in missing if row["id"] not in remaining]
+        if resurrected:
+            with self.shard_session_factories[target]() as session:
+                session.execute(delete(Post).where(Post.id.in_(resurrected)))
+                session.commit()
+
+        self._set_directory(user_id, target, None)
+        log(f"User {user_id} now served from shard {target}; waiting {wait}s before cleanup")
+        time.sleep(wait)
+
+        with self.shard_session_factories[source]() as session:
+            session.execute(delete(Post).where(Post.user_id == user_id))
+            session.commit()
+        log(f"Removed posts of user {user_id} from shard {source}")
+        return len(missing)
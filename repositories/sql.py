@@ -0,0 +1,174 @@
+import os
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select, update
+from db import mark_write, route_reads
+from models.post import Post
+from repositories.base import PostRecord, PostRef, PostRepository
+
+# --- Soft Delete Configuration ---
+
+# When enabled, deletes only mark rows with deleted_at and a background job purges them
+# in small batches. Useful for tables under heavy write contention.
+# Requires the posts.deleted_at column (run migrate.py on existing databases).
+SOFT_DELETE = os.getenv("POSTS_SOFT_DELETE", "0") == "1"
+PURGE_INTERVAL_SECONDS = int(os.getenv("POSTS_PURGE_INTERVAL_SECONDS", "60"))
+PURGE_BATCH_SIZE = int(os.getenv("POSTS_PURGE_BATCH_SIZE", "1000"))
+
+def visible(statement):
+    """
+    Restricts a statement on the posts table to rows that are not soft-deleted.
+
+    A no-op unless POSTS_SOFT_DELETE is on, so the deleted_at column is only
+    referenced where it is required to exist.
+    """
+    return statement.where(Post.deleted_at.is_(None)) if SOFT_DELETE else statement
+
+class SqlPostRepository(PostRepository):
+    """
+    Post storage backed by a SQLAlchemy database (SQLite or MySQL).
+
+    Each call uses its own short-lived session from the given session factory.
+    With the routing session from db.py, reads go to a replica unless the user
+    wrote recently, and writes go to the primary.
+
+    If an ID generator is given, post IDs come from it instead of the database's
+    autoincrement (used when posts are spread over several databases).
+
+    With POSTS_SOFT_DELETE, deleted posts are hidden from all reads until
+    purge_deleted removes them.
+    """
+
+    def __init__(self, session_factory, id_generator=None):
+        self._session_factory = session_factory
+        self._id_generator = id_generator
+
+    def add(self, user_id: int, text: str) -> PostRecord:
+        # created_at is set here rather than by the database so the record can be
+        # returned without a refresh query; the generated ID comes from the INSERT itself.
+        created_at = datetime.now()
+        values = {"user_id": user_id, "text": text, "created_at": created_at}
+        if self._id_generator is not None:
+            values["id"] = self._id_generator.next_id()
+        with self._session_factory() as session:
+            result = session.execute(insert(Post).values(**values))
+            session.commit()
+        mark_write(f"user:{user_id}")
+        return PostRecord(result.inserted_primary_key[0], user_id, text, created_at.timestamp())
+
+    def list_by_user(self, user_id: int, limit: int = None) -> list[PostRecord]:
+        statement = visible(
+            select(Post.id, Post.user_id, Post.text, Post.created_at)
+            .where(Post.user_id == user_id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+        )
+        if limit is not None:
+            statement = statement.limit(limit)
+        with self._session_factory() as session:
+            route_reads(session, f"user:{user_id}")
+            rows = session.execute(statement).all()
+        return [PostRecord(row.id, row.user_id, row.text, row.created_at.timestamp()) for row in rows]
+
+    def delete(self, post_id: int, user_id: int) -> bool:
+        # Single statement: ownership is checked in the WHERE clause and the post body is never loaded
+        if SOFT_DELETE:
+            statement = visible(update(Post).where(Post.id == post_id, Post.user_id == user_id)).values(deleted_at=func.now())
+        else:
+            statement = delete(Post).where(Post.id == post_id, Post.user_id == user_id)
+        with self._session_factory() as session:
+            result = session.execute(statement)
+            session.commit()
+        mark_write(f"user:{user_id}")
+        return result.rowcount > 0
+
+    def get_many(self, refs: list[PostRef]) -> list[PostRecord]:
+        if not refs:
+            return []
+        statement = visible(
+            select(Post.id, Post.user_id, Post.text, Post.created_at).where(Post.id.in_({ref.id for ref in refs}))
+        )
+        with self._session_factory() as session:
+            for user_id in {ref.user_id for ref in refs}:
+                route_reads(session, f"user:{user_id}")
+            rows = session.execute(statement).all()
+        return [PostRecord(row.id, row.user_id, row.text, row.created_at.timestamp()) for row in rows]
+
+    def top_authors(self, limit: int) -> list[int]:
+        return [user_id for user_id, _ in self.top_author_counts(limit)]
+
+    def top_author_counts(self, limit: int) -> list[tuple[int, int]]:
+        """
+        Returns (user_id, post count) for the users with the most posts, most posts first.
+        """
+        post_count = func.count(Post.id).label("post_count")
+        statement = visible(
+            select(Post.user_id, post_count)
+            .group_by(Post.user_id)
+            .order_by(post_count.desc())
+            .limit(limit)
+        )
+        with self._session_factory() as session:
+            return [(row.user_id, row.post_count) for row in session.execute(statement)]
+
+    def recent_authors(self, limit: int, window: int) -> list[int]:
+        return [user_id for user_id, _ in self.recent_author_counts(limit, window)]
+
+    def recent_author_counts(self, limit: int, window: int) -> list[tuple[int, int]]:
+        """
+        Returns (user_id, post count) among the `window` newest posts, most posts first.
+
+        Walks the primary key backwards with a LIMIT, so only `window` rows are read.
+        """
+        recent = visible(select(Post.user_id).order_by(Post.id.desc()).limit(window)).subquery()
+        post_count = func.count().label("post_count")
+        statement = (
+            select(recent.c.user_id, post_count)
+            .group_by(recent.c.user_id)
+            .order_by(post_count.desc())
+            .limit(limit)
+        )
+        with self._session_factory() as session:
+            return [(row.user_id, row.post_count) for row in session.execute(statement)]
+
+    def users_with_posts_older_than(self, cutoff_ts: float) -> list[int]:
+        statement = visible(select(Post.user_id).where(Post.created_at < datetime.fromtimestamp(cutoff_ts)).distinct())
+        with self._session_factory() as session:
+            return list(session.execute(statement).scalars())
+
+    def list_older_than(self, user_id: int, cutoff_ts: float) -> list[PostRecord]:
+        statement = visible(
+            select(Post.id, Post.user_id, Post.text, Post.created_at)
+            .where(Post.user_id == user_id, Post.created_at < datetime.fromtimestamp(cutoff_ts))
+            .order_by(Post.created_at.desc(), Post.id.desc())
+        )
+        with self._session_factory() as session:
+            rows = session.execute(statement).all()
+        return [PostRecord(row.id, row.user_id, row.text, row.created_at.timestamp()) for row in rows]
+
+    def delete_archived(self, user_id: int, post_ids: set[int]) -> set[int]:
+        ids = sorted(post_ids)
+        deleted = set()
+        # In batches, to keep the IN lists and each transaction short
+        for start in range(0, len(ids), PURGE_BATCH_SIZE):
+            batch = ids[start:start + PURGE_BATCH_SIZE]
+            with self._session_factory() as session:
+                session.info["use_primary"] = True
+                # Lock the rows first, so the IDs read back are exactly the ones this transaction deletes
+                found = set(session.execute(
+                    visible(select(Post.id).where(Post.user_id == user_id, Post.id.in_(batch))).with_for_update()
+                ).scalars())
+                if found:
+                    session.execute(delete(Post).where(Post.id.in_(found)))
+                session.commit()
+            deleted |= found
+        return deleted
+
+    def purge_deleted(self, batch_size: int = PURGE_BATCH_SIZE) -> int:
+        # Removes soft-deleted rows in batches to keep each transaction short
+        purged = 0
+        while True:
+            with self._session_factory() as session:
+                ids = list(session.execute(select(Post.id).where(Post.deleted_at.isnot(None)).limit(batch_size)).scalars())
+                if not ids:
+                    return purged
+                purged += session.execute(delete(Post).where(Post.id.in_(ids))).rowcount
+                session.commit()
@@ -0,0 +1,39 @@
+import argparse
+from repositories.factory import create_sharded_post_repository
+
+def move(user_id: int, shard: int):
+    """
+    Moves a user's posts to another shard while the service keeps running.
+    """
+    repository = create_sharded_post_repository(for_writes=False)
+    if not 0 <= shard < len(repository.shards):
+        raise SystemExit(f"Shard must be between 0 and {len(repository.shards) - 1}")
+    copied = repository.move_user(user_id, shard)
+    print(f"Moved user {user_id} to shard {shard} ({copied} posts copied)")
+
+def stats(recent: int):
+    """
+    Prints post counts and the newest posts across all shards.
+    """
+    repository = create_sharded_post_repository(for_writes=False)
+    print(f"Shards: {len(repository.shards)}")
+    print(f"Total posts: {repository.count_posts()}")
+    for post in repository.recent_posts(recent):
+        print(f"  {post.created_at.isoformat()}  post {post.id}  user {post.user_id}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the sharded post storage (POST_SHARD_URLS).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    move_parser = commands.add_parser("move", help="Move a user's posts to another shard")
+    move_parser.add_argument("user_id", type=int)
+    move_parser.add_argument("shard", type=int)
+
+    stats_parser = commands.add_parser("stats", help="Show post counts and recent posts across shards")
+    stats_parser.add_argument("--recent", type=int, default=10)
+
+    args = parser.parse_args()
+    if args.command == "move":
+        move(args.user_id, args.shard)
+    else:
+        stats(args.recent)
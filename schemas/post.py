@@ -24,8 +24,14 @@ class PostOut(PostBase):
     Schema for the post data returned in responses.
 
     Includes the post ID, user ID, and creation timestamp.
+
+    With sharded storage (POST_STORAGE_BACKEND=sharded) post IDs are 64-bit
+    snowflake IDs, larger than 2^53. They are sent as JSON numbers, which
+    JavaScript's JSON.parse rounds to the nearest double; JavaScript clients
+    must parse `id` losslessly (e.g. as a BigInt or string) before reusing it,
+    for example in DELETE /posts/{post_id}.
     """
-    id: int # Unique identifier for the post
+    id: int # Unique identifier for the post (may exceed 2^53, see above)
     user_id: int # The ID of the user who created the post
     created_at: datetime # Timestamp indicating when the post was created
 
@@ -1,45 +1,41 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-# from db import get_db # Comment out database import
-from models.post import Post
+from repositories.base import PostRecord, PostRepository
+from repositories.cold import get_cold_store
+from repositories.factory import get_post_repository
+from services.timeline_service import TimelineService
 from schemas.post import PostCreate, PostOut
 from auth import get_current_user
+from utils.tracing import traced
 from cache import cache
-import bcrypt
-import jwt
-from datetime import datetime, timedelta
+from db import client_last_write
 import sys
-
-# In-memory storage for posts and a counter for generating IDs
-_in_memory_posts = []
-_next_post_id = 1
+import time
 
 class PostService:
     """
-    Handles post-related business logic using in-memory storage.
+    Handles post-related business logic.
+
+    Persistence is delegated to a PostRepository (in-memory, SQLite or MySQL),
+    selected by the POST_STORAGE_BACKEND setting.
     """
-    # Remove or comment out database session initialization
-    # def __init__(self):
-    #     """
-    #     Initializes the PostService with a database session.
-    #     """
-    #     # Get a new database session for each service instance
-    #     try:
-    #         self.db = next(get_db())
-    #         print("Database session obtained successfully for PostService.", file=sys.stderr)
-    #     except Exception as e:
-    #         print(f"Error getting database session for PostService: {e}", file=sys.stderr)
-    #         raise HTTPException(status_code=500, detail="Database connection error") from e
-    
-    # Simple __init__ for in-memory version
-    def __init__(self):
-        pass # No database session needed for in-memory storage
+    def __init__(self, repository: PostRepository = None):
+        """
+        Initializes the PostService with a post repository.
+
+        Args:
+            repository (PostRepository, optional): The storage backend to use.
+                Defaults to the process-wide repository from configuration.
+        """
+        self.repository = repository or get_post_repository()
+        self.cold_store = get_cold_store()
+        self.timelines = TimelineService(post_repository=self.repository)
 
+    @traced
     async def add_post(self, post_data: PostCreate, token: str) -> PostOut:
         """
-        Creates a new post for the authenticated user in memory.
+        Creates a new post for the authenticated user.
 
-        Validates the post text size and adds the post to in-memory storage.
+        Validates the post text size and adds the post to the repository.
 
         Args:
             post_data (PostCreate): The post data (text).
@@ -51,8 +47,7 @@ class PostService:
         Raises:
             HTTPException: If the token is invalid (401), if the post content is too large (400).
         """
-        print("Attempting to add post (in-memory)...", file=sys.stderr)
-        global _next_post_id, _in_memory_posts
+        print("Attempting to add post...", file=sys.stderr)
         try:
             user_id = get_current_user(token)
             print(f"User ID from token: {user_id}", file=sys.stderr)
@@ -61,97 +56,92 @@ class PostService:
             if len(post_data.text) > 1000000: # Example size limit matching VARCHAR(1000000) or TEXT
                  raise HTTPException(status_code=400, detail="Post content too large")
 
-            # Create in-memory post object
-            new_post = {
-                "id": _next_post_id,
-                "user_id": user_id,
-                "text": post_data.text,
-                "created_at": datetime.now()
-            }
-            _in_memory_posts.append(new_post)
-            post_id = _next_post_id
-            _next_post_id += 1
-            
-            print(f"Post added to in-memory storage. Post ID: {post_id}", file=sys.stderr)
-
-            # Invalidate cache for this user's posts after adding a new post (if caching is still desired for in-memory)
+            new_post = self.repository.add(user_id, post_data.text)
+            print(f"Post added to storage. Post ID: {new_post.id}", file=sys.stderr)
+
+            # Push the post to the precomputed home timelines of the author's followers
+            self.timelines.fan_out_post(new_post)
+
+            # Invalidate cache for this user's posts after adding a new post
             cache_key = f"user_posts:{user_id}"
             if cache_key in cache:
                 del cache[cache_key]
                 print(f"Cache invalidated for user: {user_id}", file=sys.stderr)
 
             # Return the created post details
-            return PostOut(id=new_post["id"], user_id=new_post["user_id"], text=new_post["text"], created_at=new_post["created_at"])
+            return new_post.to_post_out()
 
         except HTTPException as e:
-            print(f"Caught HTTPException during add_post (in-memory): {e.detail}", file=sys.stderr)
+            print(f"Caught HTTPException during add_post: {e.detail}", file=sys.stderr)
             raise e
         except Exception as e:
-            print(f"Caught unexpected exception during add_post (in-memory): {e}", file=sys.stderr)
+            print(f"Caught unexpected exception during add_post: {e}", file=sys.stderr)
             import traceback
             traceback.print_exc(file=sys.stderr)
             raise HTTPException(status_code=500, detail="Internal Server Error during add_post") from e
 
-    async def get_posts(self, token: str) -> list[PostOut]:
+    @traced
+    async def get_posts(self, token: str, limit: int = None, offset: int = 0) -> list[PostRecord]:
         """
-        Retrieves all posts for the authenticated user from in-memory storage.
+        Retrieves the authenticated user's posts, optionally one page at a time.
 
-        Checks the cache first, and if not found, fetches from in-memory storage,
-        caches the result, and returns the posts.
+        Checks the cache first, and if not found, fetches from the repository,
+        caches the result, and returns the posts. Archived (cold) posts are only
+        read when an explicit page (limit) extends past the user's hot posts;
+        without a limit only hot posts are returned, so an unbounded request
+        never reads the whole archive.
 
         Args:
             token (str): The JWT token from the request header.
+            limit (int, optional): Maximum number of posts to return; all hot posts if None.
+            offset (int): Number of posts to skip.
 
         Returns:
-            list[PostOut]: A list of the user's posts, ordered by creation date (latest first).
+            list[PostRecord]: A list of the user's posts, ordered by creation date (latest first).
+                The records are serialized directly at the response boundary (see utils/serialization.py).
 
         Raises:
             HTTPException: If the token is invalid (401),
                            or if there's an unexpected error (500).
         """
-        print("Attempting to get posts (in-memory)...", file=sys.stderr)
+        print("Attempting to get posts...", file=sys.stderr)
         try:
             user_id = get_current_user(token)
             print(f"User ID from token for getting posts: {user_id}", file=sys.stderr)
 
-            cache_key = f"user_posts:{user_id}"
-            
-            # Try to get posts from cache
-            if cache_key in cache:
-                post_list = cache[cache_key]
-                print(f"Returning posts from cache for user: {user_id}", file=sys.stderr)
-                return post_list
-
-            print(f"Fetching posts from in-memory storage for user: {user_id}", file=sys.stderr)
-            # Filter posts from in-memory storage for the current user
-            user_posts = [post for post in _in_memory_posts if post["user_id"] == user_id]
-            
-            # Order by creation date descending
-            user_posts.sort(key=lambda x: x["created_at"], reverse=True)
-            
-            # Convert in-memory dicts to Pydantic models for caching and return
-            post_list = [PostOut(id=post["id"], user_id=post["user_id"], text=post["text"], created_at=post["created_at"]) for post in user_posts]
-            
-            # Cache the result for 5 minutes (300 seconds)
-            cache[cache_key] = post_list # Use dictionary assignment
-            print(f"Cached posts for user: {user_id}", file=sys.stderr)
-
-            return post_list
+            hot_posts = self._get_user_posts(user_id)
+            end = None if limit is None else offset + limit
+            page = list(hot_posts[offset:end])
+            if self.cold_store is None or end is None or end <= len(hot_posts):
+                return page
+
+            # The page extends past the hot window: continue with archived posts.
+            # Posts still in the hot store (e.g. mid-archival) are skipped.
+            cold_started = time.perf_counter()
+            cold_posts = self.cold_store.list_by_user(
+                user_id,
+                offset=max(0, offset - len(hot_posts)),
+                limit=None if limit is None else limit - len(page),
+                exclude_ids={post.id for post in hot_posts},
+            )
+            print(f"Read {len(cold_posts)} cold posts for user {user_id} in {(time.perf_counter() - cold_started) * 1000:.2f} ms", file=sys.stderr)
+            return page + cold_posts
 
         except HTTPException as e:
-            print(f"Caught HTTPException during get_posts (in-memory): {e.detail}", file=sys.stderr)
+            print(f"Caught HTTPException during get_posts: {e.detail}", file=sys.stderr)
             raise e
         except Exception as e:
-            print(f"Caught unexpected exception during get_posts (in-memory): {e}", file=sys.stderr)
+            print(f"Caught unexpected exception during get_posts: {e}", file=sys.stderr)
             import traceback
             traceback.print_exc(file=sys.stderr)
             raise HTTPException(status_code=500, detail="Internal Server Error during get_posts") from e
 
+    @traced
     async def delete_post(self, post_id: int, token: str):
         """
-        Deletes a post for the authenticated user from in-memory storage.
+        Deletes a post for the authenticated user.
 
-        Deletes the post from in-memory storage and invalidates the cache
+        Deletes the post from the repository and invalidates the cache
         for the user's posts.
 
         Args:
@@ -165,25 +155,20 @@ class PostService:
             HTTPException: If the token is invalid (401), if the post is not found
                            or doesn't belong to the user (404).
         """
-        print(f"Attempting to delete post with ID: {post_id} (in-memory)...", file=sys.stderr)
-        global _in_memory_posts
+        print(f"Attempting to delete post with ID: {post_id}...", file=sys.stderr)
         try:
             user_id = get_current_user(token)
             print(f"User ID from token for deleting post: {user_id}", file=sys.stderr)
 
-            # Find the post in in-memory storage
-            post_to_delete = None
-            for i, post in enumerate(_in_memory_posts):
-                if post["id"] == post_id and post["user_id"] == user_id:
-                    post_to_delete = post
-                    del _in_memory_posts[i]
-                    break
-
-            if not post_to_delete:
-                print(f"Post with ID {post_id} not found for user {user_id} (in-memory).", file=sys.stderr)
+            deleted = self.repository.delete(post_id, user_id)
+            if not deleted and self.cold_store is not None:
+                deleted = self.cold_store.delete(post_id, user_id)
+            if not deleted:
+                print(f"Post with ID {post_id} not found for user {user_id}.", file=sys.stderr)
                 raise HTTPException(status_code=404, detail="Post not found")
 
-            print(f"Post with ID {post_id} deleted from in-memory storage.", file=sys.stderr)
+            print(f"Post with ID {post_id} deleted from storage.", file=sys.stderr)
+            self.timelines.remove_post(user_id, post_id)
 
             # Invalidate cache for this user's posts after deletion
             cache_key = f"user_posts:{user_id}"
@@ -194,10 +179,45 @@ class PostService:
             return {"message": "Post deleted successfully"}
 
         except HTTPException as e:
-            print(f"Caught HTTPException during delete_post (in-memory): {e.detail}", file=sys.stderr)
+            print(f"Caught HTTPException during delete_post: {e.detail}", file=sys.stderr)
             raise e
         except Exception as e:
-            print(f"Caught unexpected exception during delete_post (in-memory): {e}", file=sys.stderr)
+            print(f"Caught unexpected exception during delete_post: {e}", file=sys.stderr)
             import traceback
             traceback.print_exc(file=sys.stderr)
-            raise HTTPException(status_code=500, detail="Internal Server Error during delete_post") from e 
\ No newline at end of file
+            raise HTTPException(status_code=500, detail="Internal Server Error during delete_post") from e
+
+    @traced
+    def _get_user_posts(self, user_id: int) -> tuple[PostRecord, ...]:
+        """
+        Returns a user's posts (latest first), serving from the cache when possible.
+
+        The cache holds references to the post records, not PostOut copies;
+        a miss loads the posts from the repository and caches them for 5 minutes.
+        An entry loaded before the client's last write (possibly made through
+        another worker, see utils/consistency.py) is reloaded.
+
+        Args:
+            user_id (int): The ID of the user whose posts are returned.
+
+        Returns:
+            tuple[PostRecord, ...]: The user's posts.
+        """
+        cache_key = f"user_posts:{user_id}"
+
+        # Try to get posts from cache
+        if cache_key in cache:
+            loaded_ts, user_posts = cache[cache_key]
+            last_write = client_last_write()
+            if last_write is None or loaded_ts >= last_write:
+                print(f"Returning posts from cache for user: {user_id}", file=sys.stderr)
+                return user_posts
+
+        print(f"Fetching posts from storage for user: {user_id}", file=sys.stderr)
+        loaded_ts = time.time()
+        user_posts = tuple(self.repository.list_by_user(user_id))
+
+        # Cache the result for 5 minutes (300 seconds)
+        cache[cache_key] = (loaded_ts, user_posts) # Use dictionary assignment
+        print(f"Cached posts for user: {user_id}", file=sys.stderr)
+        return user_posts
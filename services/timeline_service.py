@@ -0,0 +1,282 @@
+import os
+import sys
+import threading
+from collections import deque
+from itertools import islice
+from cachetools import TTLCache
+from fastapi import HTTPException
+from sqlalchemy import select
+from auth import get_current_user
+from db import SessionLocal
+from models.user import User
+from utils.tracing import traced
+from repositories.base import PostRecord, PostRef, PostRepository
+from repositories.factory import get_follow_repository, get_post_repository
+from repositories.follows import FollowRepository
+
+# --- Timeline Configuration ---
+
+# Maximum number of posts kept in each user's precomputed home timeline
+TIMELINE_MAX_LENGTH = int(os.getenv("TIMELINE_MAX_LENGTH", "800"))
+
+# Authors with more followers than this are not fanned out on write;
+# their posts are pulled into their followers' timelines at read time instead.
+FANOUT_MAX_FOLLOWERS = int(os.getenv("FANOUT_MAX_FOLLOWERS", "10000"))
+
+# Number of precomputed timelines kept per worker (a full one holds about 100 KB of refs)
+TIMELINE_CACHE_SIZE = int(os.getenv("TIMELINE_CACHE_SIZE", "1000"))
+
+# Seconds a precomputed timeline (and a cached follower count) is used before it is rebuilt
+TIMELINE_TTL_SECONDS = int(os.getenv("TIMELINE_TTL_SECONDS", "60"))
+
+# --- Precomputed Timelines ---
+
+# Per-user home timelines as PostRefs (no texts), newest first. A user without an
+# entry has no precomputed timeline (expired, evicted or after a restart); it is
+# rebuilt on first read. Each worker has its own copy and fan-out only reaches the
+# worker that handled the write, so other workers see a new post once their copy
+# expires. Posts are fetched from the post repository on read, so a deleted post
+# disappears from every worker's timelines at once.
+_timelines: TTLCache = TTLCache(maxsize=TIMELINE_CACHE_SIZE, ttl=TIMELINE_TTL_SECONDS)
+# Follower counts that decide which authors are pulled at read time
+_follower_counts: TTLCache = TTLCache(maxsize=100000, ttl=TIMELINE_TTL_SECONDS)
+_lock = threading.Lock()
+
+def _user_exists(user_id: int) -> bool:
+    """
+    Checks the users table on the primary (a replica may not have a new signup yet).
+    """
+    with SessionLocal() as session:
+        session.info["use_primary"] = True
+        return session.execute(select(User.id).where(User.id == user_id)).first() is not None
+
+def _replace(timeline: deque, refs: list[PostRef]):
+    """
+    Replaces a timeline's refs in place, so the cache entry keeps its original expiry.
+    """
+    timeline.clear()
+    timeline.extend(refs)
+
+def _merge(posts, limit: int) -> list:
+    """
+    Orders posts (PostRecords or PostRefs) newest first, drops duplicates and keeps at most `limit` of them.
+    """
+    seen = set()
+    merged = []
+    for post in sorted(posts, key=lambda post: (post.created_ts, post.id), reverse=True):
+        if post.id not in seen:
+            seen.add(post.id)
+            merged.append(post)
+            if len(merged) == limit:
+                break
+    return merged
+
+class TimelineService:
+    """
+    Handles the follow graph and users' home timelines.
+
+    Timelines are precomputed: when a post is added it is pushed (fanned out) to
+    the bounded timeline of every follower of its author. Authors with huge
+    follower counts are skipped on write and merged into timelines on read.
+    """
+    def __init__(self, post_repository: PostRepository = None, follow_repository: FollowRepository = None):
+        """
+        Initializes the TimelineService with the post and follow graph repositories.
+        """
+        self.post_repository = post_repository or get_post_repository()
+        self.follow_repository = follow_repository or get_follow_repository()
+
+    @traced
+    async def follow(self, followee_id: int, token: str) -> dict:
+        """
+        Makes the authenticated user follow another user.
+
+        Backfills the followee's recent posts into the follower's timeline.
+
+        Args:
+            followee_id (int): The ID of the user to follow.
+            token (str): The JWT token from the request header.
+
+        Returns:
+            dict: A confirmation message.
+
+        Raises:
+            HTTPException: If the token is invalid (401), if users try to follow themselves (400),
+                           or if the followee does not exist (404).
+        """
+        user_id = get_current_user(token)
+        if followee_id == user_id:
+            raise HTTPException(status_code=400, detail="Cannot follow yourself")
+        if not _user_exists(followee_id):
+            raise HTTPException(status_code=404, detail="User not found")
+
+        if self.follow_repository.follow(user_id, followee_id):
+            print(f"User {user_id} now follows user {followee_id}", file=sys.stderr)
+            if not self._pull_authors([followee_id]):
+                recent_posts = [post.to_ref() for post in self.post_repository.list_by_user(followee_id, TIMELINE_MAX_LENGTH)]
+                with _lock:
+                    timeline = _timelines.get(user_id)
+                    if timeline is not None:
+                        _replace(timeline, _merge([*timeline, *recent_posts], TIMELINE_MAX_LENGTH))
+        return {"message": "Followed successfully"}
+
+    @traced
+    async def unfollow(self, followee_id: int, token: str) -> dict:
+        """
+        Makes the authenticated user stop following another user.
+
+        Removes the followee's posts from the follower's timeline.
+
+        Args:
+            followee_id (int): The ID of the user to unfollow.
+            token (str): The JWT token from the request header.
+
+        Returns:
+            dict: A confirmation message.
+
+        Raises:
+            HTTPException: If the token is invalid (401), or if the user was not followed (404).
+        """
+        user_id = get_current_user(token)
+        if not self.follow_repository.unfollow(user_id, followee_id):
+            raise HTTPException(status_code=404, detail="Not following this user")
+
+        print(f"User {user_id} unfollowed user {followee_id}", file=sys.stderr)
+        with _lock:
+            timeline = _timelines.get(user_id)
+            if timeline is not None:
+                _replace(timeline, [ref for ref in timeline if ref.user_id != followee_id])
+        return {"message": "Unfollowed successfully"}
+
+    @traced
+    async def get_timeline(self, token: str, limit: int = 50) -> list[PostRecord]:
+        """
+        Retrieves the authenticated user's home timeline.
+
+        Serves the precomputed timeline, merged with recent posts of followed
+        authors that are not fanned out on write. The posts are fetched from the
+        post repository, so deleted posts are skipped.
+
+        Args:
+            token (str): The JWT token from the request header.
+            limit (int): The maximum number of posts to return.
+
+        Returns:
+            list[PostRecord]: Posts of followed users, ordered by creation date (latest first).
+
+        Raises:
+            HTTPException: If the token is invalid (401).
+        """
+        user_id = get_current_user(token)
+        limit = max(1, min(limit, TIMELINE_MAX_LENGTH))
+        followees = self.follow_repository.followees(user_id)
+        pull_authors = self._pull_authors(followees)
+
+        timeline = _timelines.get(user_id)
+        if timeline is None:
+            timeline = self._rebuild(user_id, followees, pull_authors)
+        with _lock:
+            # Refs stored before an author switched to pull mode are superseded by the pulled posts
+            stored = [ref for ref in timeline if ref.user_id not in pull_authors]
+        posts = self._fetch(timeline, iter(stored), limit)
+        if pull_authors:
+            pulled = []
+            for author_id in pull_authors:
+                pulled.extend(self.post_repository.list_by_user(author_id, limit))
+            posts = _merge([*posts, *pulled], limit)
+        return posts
+
+    def _fetch(self, timeline: deque, refs, limit: int) -> list[PostRecord]:
+        """
+        Fetches up to `limit` posts for timeline refs (newest first), skipping deleted ones.
+
+        Refs whose post no longer exists are dropped from this worker's copy of the timeline.
+        """
+        posts = []
+        missing = set()
+        while len(posts) < limit:
+            chunk = list(islice(refs, limit - len(posts)))
+            if not chunk:
+                break
+            found = {post.id: post for post in self.post_repository.get_many(chunk)}
+            posts.extend(found[ref.id] for ref in chunk if ref.id in found)
+            missing.update(ref.id for ref in chunk if ref.id not in found)
+        if missing:
+            with _lock:
+                _replace(timeline, [ref for ref in timeline if ref.id not in missing])
+        return posts
+
+    def _pull_authors(self, author_ids: list[int]) -> set[int]:
+        """
+        Returns the authors among `author_ids` with more than FANOUT_MAX_FOLLOWERS followers.
+
+        Follower counts come from the follow repository (shared by all workers) and
+        are cached for TIMELINE_TTL_SECONDS.
+        """
+        missing = [author_id for author_id in author_ids if author_id not in _follower_counts]
+        if missing:
+            counts = self.follow_repository.follower_counts(missing)
+            for author_id in missing:
+                _follower_counts[author_id] = counts.get(author_id, 0)
+        return {author_id for author_id in author_ids if _follower_counts.get(author_id, 0) > FANOUT_MAX_FOLLOWERS}
+
+    @traced
+    def _rebuild(self, user_id: int, followees: list[int], pull_authors: set[int]) -> deque:
+        """
+        Builds a user's precomputed timeline from the recent posts of their followees.
+        """
+        print(f"Rebuilding timeline for user: {user_id}", file=sys.stderr)
+        refs = []
+        for author_id in followees:
+            if author_id not in pull_authors:
+                refs.extend(post.to_ref() for post in self.post_repository.list_by_user(author_id, TIMELINE_MAX_LENGTH))
+        timeline = deque(_merge(refs, TIMELINE_MAX_LENGTH), maxlen=TIMELINE_MAX_LENGTH)
+        with _lock:
+            _timelines[user_id] = timeline
+        return timeline
+
+    @traced
+    def fan_out_post(self, post: PostRecord):
+        """
+        Pushes a new post to the precomputed timelines of its author's followers.
+
+        Authors with more than FANOUT_MAX_FOLLOWERS followers are switched to
+        pull-on-read instead.
+
+        Args:
+            post (PostRecord): The newly added post.
+        """
+        follower_count = self.follow_repository.follower_count(post.user_id)
+        _follower_counts[post.user_id] = follower_count
+        if follower_count > FANOUT_MAX_FOLLOWERS:
+            return
+
+        followers = self.follow_repository.followers(post.user_id)
+        ref = post.to_ref()
+        with _lock:
+            for follower_id in followers:
+                timeline = _timelines.get(follower_id)
+                if timeline is not None:
+                    timeline.appendleft(ref)
+        print(f"Fanned out post {post.id} to {len(followers)} followers", file=sys.stderr)
+
+    @traced
+    def remove_post(self, author_id: int, post_id: int):
+        """
+        Removes a deleted post from this worker's precomputed timelines of its author's followers.
+
+        Other workers skip the post on read (see get_timeline); this just frees the refs.
+
+        Args:
+            author_id (int): The ID of the deleted post's author.
+            post_id (int): The ID of the deleted post.
+        """
+        followers = self.follow_repository.followers(author_id)
+        with _lock:
+            for follower_id in followers:
+                timeline = _timelines.get(follower_id)
+                if timeline is not None:
+                    for ref in timeline:
+                        if ref.id == post_id:
+                            timeline.remove(ref)
+                            break
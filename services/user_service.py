@@ -2,10 +2,15 @@ import bcrypt
 import jwt
 from datetime import datetime, timedelta
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from db import get_db
+from db import get_db, mark_write, reads_from_replica, route_reads
 from models.user import User
 from schemas.user import UserCreate, UserLogin, UserOut
+from cache import user_lookup_cache, user_lookup_negative_cache
+from utils.tracing import traced
 import sys
 
 class UserService:
@@ -26,6 +31,7 @@ class UserService:
             # Depending on how critical this is, you might want to re-raise or handle differently
             raise HTTPException(status_code=500, detail="Database connection error") from e
 
+    @traced
     async def signup(self, user_data: UserCreate):
         """
         Registers a new user.
@@ -45,47 +51,45 @@ class UserService:
         """
         print("Attempting user signup...", file=sys.stderr)
         try:
-            # Check if user already exists
-            print(f"Checking for existing user with email: {user_data.email}", file=sys.stderr)
-            existing_user = self.db.query(User).filter(User.email == user_data.email).first()
-            if existing_user:
-                print("User already exists.", file=sys.stderr)
-                raise HTTPException(status_code=400, detail="Email already registered")
-            
             print("Hashing password...", file=sys.stderr)
-            # Hash the password
-            hashed_password = bcrypt.hashpw(user_data.password.encode(), bcrypt.gensalt())
+            # Hash the password in the threadpool: bcrypt is deliberately slow and would block the event loop
+            hashed_password = (await run_in_threadpool(bcrypt.hashpw, user_data.password.encode(), bcrypt.gensalt())).decode()
             print("Password hashed.", file=sys.stderr)
 
-            print("Creating new user object...", file=sys.stderr)
-            # Create new user
-            user = User(
-                email=user_data.email,
-                hashed_password=hashed_password.decode()
-            )
-            print("User object created.", file=sys.stderr)
-
-            print("Adding user to session...", file=sys.stderr)
-            self.db.add(user)
-            print("User added to session. Committing...", file=sys.stderr)
-            self.db.commit()
-            print("Commit successful. Refreshing user object...", file=sys.stderr)
-            # The refresh is crucial to get the generated ID from the database
-            self.db.refresh(user)
-            print(f"User object refreshed. User ID: {user.id}", file=sys.stderr)
-            
-            # Check if user.id is populated after refresh
-            if user.id is None:
-                 print("Error: User ID is None after refresh!", file=sys.stderr)
+            # Insert the user in a single statement. The unique index on users.email
+            # rejects duplicates, so no separate existence check is needed, and the
+            # generated ID comes back from the INSERT itself (no refresh query).
+            print("Inserting new user...", file=sys.stderr)
+            try:
+                result = self.db.execute(
+                    insert(User).values(email=user_data.email, hashed_password=hashed_password)
+                )
+                self.db.commit()
+                mark_write(f"email:{user_data.email}")
+            except IntegrityError:
+                print("User already exists.", file=sys.stderr)
+                self.db.rollback()
+                raise HTTPException(status_code=400, detail="Email already registered")
+
+            user_id = result.inserted_primary_key[0]
+            print(f"Commit successful. User ID: {user_id}", file=sys.stderr)
+
+            # Check if the user ID was returned by the INSERT
+            if user_id is None:
+                 print("Error: User ID is None after insert!", file=sys.stderr)
                  raise HTTPException(status_code=500, detail="Could not retrieve user ID after signup")
 
+            # Replace any (negative) login cache entry for this email
+            user_lookup_negative_cache.pop(user_data.email, None)
+            user_lookup_cache[user_data.email] = (user_id, hashed_password)
+
             print("Generating token...", file=sys.stderr)
             # Generate token
-            token = self._create_token(user.id)
+            token = self._create_token(user_id)
             print("Token generated.", file=sys.stderr)
 
             # Create a dictionary matching the UserOut schema
-            response_data = {"id": user.id, "email": user.email, "token": token}
+            response_data = {"id": user_id, "email": user_data.email, "token": token}
             print(f"Data being returned: {response_data}", file=sys.stderr)
 
             # Return an instance of UserOut
@@ -104,6 +108,7 @@ class UserService:
             self.db.rollback() # Rollback in case of unexpected errors
             raise HTTPException(status_code=500, detail="Internal Server Error during signup") from e
 
+    @traced
     async def login(self, user_data: UserLogin):
         """
         Authenticates an existing user.
@@ -122,16 +127,18 @@ class UserService:
         """
         print("Attempting user login...", file=sys.stderr)
         try:
-            user = self.db.query(User).filter(User.email == user_data.email).first()
-            if not user or not bcrypt.checkpw(user_data.password.encode(), user.hashed_password.encode()):
+            credentials = self._lookup_credentials(user_data.email)
+            # bcrypt runs in the threadpool so it doesn't block other requests on the event loop
+            if credentials is None or not await run_in_threadpool(bcrypt.checkpw, user_data.password.encode(), credentials[1].encode()):
                 print("Invalid credentials during login.", file=sys.stderr)
                 raise HTTPException(status_code=401, detail="Invalid credentials")
-            
-            print(f"User found for login. User ID: {user.id}", file=sys.stderr)
-            token = self._create_token(user.id)
+
+            user_id = credentials[0]
+            print(f"User found for login. User ID: {user_id}", file=sys.stderr)
+            token = self._create_token(user_id)
             print("Token generated for login.", file=sys.stderr)
 
-            response_data = {"id": user.id, "email": user.email, "token": token}
+            response_data = {"id": user_id, "email": user_data.email, "token": token}
             print(f"Returning login data: {response_data}", file=sys.stderr)
             # Return an instance of UserOut for login as well
             return UserOut(**response_data)
@@ -148,6 +155,43 @@ class UserService:
             raise HTTPException(status_code=500, detail="Internal Server Error during login") from e
 
 
+    @traced
+    def _lookup_credentials(self, email: str):
+        """
+        Looks up the (user_id, hashed_password) pair for an email.
+
+        Serves from the bounded login cache when possible, including short-lived
+        negative entries for emails that are not registered, and only queries the
+        database on a cache miss. A miss read from a replica is not cached, since
+        the replica may not have the user's signup yet.
+
+        Args:
+            email (str): The email address to look up.
+
+        Returns:
+            tuple[int, str] | None: The user ID and password hash, or None if no user has this email.
+        """
+        if email in user_lookup_cache:
+            print("Login lookup served from cache.", file=sys.stderr)
+            return user_lookup_cache[email]
+        if email in user_lookup_negative_cache:
+            print("Login lookup served from cache (unknown email).", file=sys.stderr)
+            return None
+
+        route_reads(self.db, f"email:{email}")
+        row = (
+            self.db.query(User.id, User.hashed_password)
+            .filter(User.email == email)
+            .first()
+        )
+        if row is None:
+            if not reads_from_replica(self.db):
+                user_lookup_negative_cache[email] = True
+            return None
+        credentials = (row.id, row.hashed_password)
+        user_lookup_cache[email] = credentials
+        return credentials
+
     def _create_token(self, user_id: int) -> str:
         """
         Creates a JWT token for a given user ID.
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+
+# The app reads its configuration from the environment at import time, so point
+# it at throwaway SQLite databases before anything from the repo is imported.
+_test_dir = tempfile.mkdtemp(prefix="posts_tests_")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{_test_dir}/primary.db")
+os.environ.setdefault("POST_SQLITE_URL", f"sqlite:///{_test_dir}/posts.db")
+os.environ.setdefault("POST_STORAGE_BACKEND", "memory")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import event
+from database import Base, engine
+from models.follow import Follow
+from models.post import Post
+from models.user import User
+
+Base.metadata.create_all(bind=engine)
+
+@pytest.fixture
+def test_dir() -> str:
+    """
+    Directory holding the test databases.
+    """
+    return _test_dir
+
+@pytest.fixture
+def count_queries():
+    """
+    Counts the statements sent to an engine (one per database round trip).
+
+    Usage: `with count_queries(engine) as statements: ...`, then `len(statements)`.
+    """
+    class Counter:
+        def __init__(self, target_engine):
+            self.engine = target_engine
+            self.statements = []
+
+        def _record(self, conn, cursor, statement, parameters, context, executemany):
+            self.statements.append(statement)
+
+        def __enter__(self):
+            event.listen(self.engine, "before_cursor_execute", self._record)
+            return self.statements
+
+        def __exit__(self, *exc_info):
+            event.remove(self.engine, "before_cursor_execute", self._record)
+
+    return Counter
@@ -0,0 +1,94 @@
+import asyncio
+from utils.admission import AdmissionController
+
+def controller(capacity: int, **caps) -> AdmissionController:
+    return AdmissionController(capacity, {
+        name: {"concurrency": caps.get(name, capacity), "queue": 8, "timeout": 1.0}
+        for name in ("post_read", "post_write", "auth")
+    })
+
+def test_freed_slot_goes_to_highest_priority_waiter():
+    async def scenario():
+        admission = controller(2)
+        assert await admission.acquire("post_write")
+        assert await admission.acquire("post_write")
+        auth = asyncio.ensure_future(admission.acquire("auth"))
+        await asyncio.sleep(0)
+        read = asyncio.ensure_future(admission.acquire("post_read"))
+        await asyncio.sleep(0)
+
+        # auth has waited longer, but the read outranks it
+        admission.release("post_write")
+        assert await read is True
+        assert not auth.done()
+        assert admission.limiters["auth"].in_flight == 0
+
+        admission.release("post_write")
+        assert await auth is True
+        assert admission.stats()["in_flight"] == 2
+    asyncio.run(scenario())
+
+def test_class_cap_leaves_shared_slots_to_other_classes():
+    async def scenario():
+        admission = controller(3, auth=1)
+        assert await admission.acquire("auth")
+        second_auth = asyncio.ensure_future(admission.acquire("auth"))
+        await asyncio.sleep(0)
+        assert not second_auth.done()
+        assert await admission.acquire("post_read")
+
+        admission.release("auth")
+        assert await second_auth is True
+    asyncio.run(scenario())
+
+def test_full_queue_and_no_queueing_are_rejected():
+    async def scenario():
+        admission = controller(1)
+        admission.limiters["post_write"].queue = 0
+        assert await admission.acquire("post_read")
+        assert await admission.acquire("post_write") is False
+        assert await admission.acquire("auth", may_queue=False) is False
+        assert admission.stats()["post_write"]["rejected"] == 1
+    asyncio.run(scenario())
+
+def test_wait_past_deadline_is_rejected_and_frees_queue():
+    async def scenario():
+        admission = controller(1)
+        admission.limiters["post_read"].timeout = 0.01
+        assert await admission.acquire("post_read")
+        assert await admission.acquire("post_read") is False
+        stats = admission.stats()["post_read"]
+        assert (stats["timed_out"], stats["queue_depth"]) == (1, 0)
+
+        admission.release("post_read")
+        assert admission.stats()["in_flight"] == 0
+    asyncio.run(scenario())
+
+def test_class_waiting_on_its_own_cap_does_not_block_others():
+    async def scenario():
+        admission = controller(64, post_write=32)
+        for _ in range(32):
+            assert await admission.acquire("post_write")
+        queued_write = asyncio.ensure_future(admission.acquire("post_write"))
+        await asyncio.sleep(0)
+        assert not queued_write.done()
+
+        # 32 shared slots are free: auth is admitted, even without queueing (as the middleware asks)
+        assert not admission.higher_priority_waiting("auth")
+        assert await admission.acquire("auth", may_queue=False) is True
+
+        admission.release("post_write")
+        assert await queued_write is True
+    asyncio.run(scenario())
+
+def test_waiter_that_could_use_a_shared_slot_still_blocks_lower_classes():
+    async def scenario():
+        admission = controller(1)
+        assert await admission.acquire("post_write")
+        read = asyncio.ensure_future(admission.acquire("post_read"))
+        await asyncio.sleep(0)
+        assert admission.higher_priority_waiting("auth")
+        assert await admission.acquire("auth", may_queue=False) is False
+        admission.release("post_write")
+        assert await read is True
+    asyncio.run(scenario())
@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta
+import jwt
+import pytest
+from auth import ALGORITHM, SECRET_KEY
+from cache import cache
+from repositories.base import PostRecord
+from repositories.cold import ColdSegmentStore
+from repositories.memory import MemoryPostRepository
+from services.archive_service import archive_old_posts
+from services.post_service import PostService
+
+class DeleteDuringArchival(MemoryPostRepository):
+    """
+    Deletes a post the way a concurrent DELETE /posts would, after its segment is written but before the hot delete.
+    """
+
+    def __init__(self, post_id: int):
+        super().__init__()
+        self.post_id = post_id
+
+    def delete_archived(self, user_id: int, post_ids: set[int]) -> set[int]:
+        assert self.delete(self.post_id, user_id)
+        return super().delete_archived(user_id, post_ids)
+
+@pytest.fixture
+def service(tmp_path) -> PostService:
+    """
+    A PostService for user 1 with two old posts archived to cold segments and one recent hot post.
+    """
+    repository = MemoryPostRepository()
+    now = datetime.now()
+    repository.bulk_load([
+        {"user_id": 1, "text": "oldest", "created_at": now - timedelta(days=60)},
+        {"user_id": 1, "text": "old", "created_at": now - timedelta(days=40)},
+        {"user_id": 1, "text": "recent", "created_at": now},
+    ])
+    service = PostService(repository=repository)
+    service.cold_store = ColdSegmentStore(str(tmp_path))
+    assert archive_old_posts(repository, service.cold_store, older_than_days=30)["posts"] == 2
+    cache.pop("user_posts:1", None)
+    return service
+
+def texts(service: PostService, limit=None, offset=0) -> list[str]:
+    token = jwt.encode({"sub": "1"}, SECRET_KEY, algorithm=ALGORITHM)
+    return [post.text for post in asyncio.run(service.get_posts(token, limit, offset))]
+
+def test_unbounded_read_returns_hot_posts_only(service):
+    assert texts(service) == ["recent"]
+
+def test_page_past_hot_posts_continues_in_cold_tier(service):
+    assert texts(service, limit=3) == ["recent", "old", "oldest"]
+    assert texts(service, limit=1, offset=1) == ["old"]
+
+def test_post_deleted_during_archival_stays_deleted(tmp_path):
+    old = datetime.now() - timedelta(days=40)
+    repository = DeleteDuringArchival(post_id=2)
+    repository.bulk_load([
+        {"id": 1, "user_id": 1, "text": "kept", "created_at": old},
+        {"id": 2, "user_id": 1, "text": "deleted", "created_at": old + timedelta(seconds=1)},
+    ])
+    cold_store = ColdSegmentStore(str(tmp_path))
+    assert archive_old_posts(repository, cold_store, older_than_days=30)["posts"] == 1
+    assert [post.text for post in cold_store.list_by_user(1)] == ["kept"]
+    assert cold_store.tombstones(1) == {2}
+
+def archive(cold_store: ColdSegmentStore, *ids: int):
+    cold_store.write_segment(1, [PostRecord(post_id, 1, f"post {post_id}", 1000.0 + post_id) for post_id in ids])
+
+def test_compaction_merges_segments_and_folds_in_tombstones(tmp_path):
+    cold_store = ColdSegmentStore(str(tmp_path))
+    archive(cold_store, 1, 2)
+    archive(cold_store, 3)
+    assert cold_store.delete(2, 1)
+    assert cold_store.compact(1) == 2
+    assert len(cold_store._segment_paths(1)) == 1
+    assert cold_store.tombstones(1) == set()
+    assert [post.id for post in cold_store.list_by_user(1)] == [3, 1]
+    assert cold_store.delete(1, 1)
+
+def test_archival_compacts_once_a_user_has_too_many_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr("repositories.cold.COLD_MAX_SEGMENTS", 2)
+    cold_store = ColdSegmentStore(str(tmp_path))
+    archive(cold_store, 1)
+    archive(cold_store, 2)
+    assert len(cold_store._segment_paths(1)) == 2
+    archive(cold_store, 3)
+    assert len(cold_store._segment_paths(1)) == 1
+    assert [post.id for post in cold_store.list_by_user(1)] == [3, 2, 1]
+
+def test_reads_during_compaction_see_each_post_once(tmp_path, monkeypatch):
+    cold_store = ColdSegmentStore(str(tmp_path))
+    # Merged segment written, replaced segments not removed yet
+    archive(cold_store, 1, 2)
+    archive(cold_store, 1, 2)
+    assert [post.id for post in cold_store.list_by_user(1)] == [2, 1]
+
+    # Segments listed, then removed by a compaction before they were opened
+    listings = iter([[str(tmp_path / "gone.seg")], cold_store._segment_paths(1)])
+    monkeypatch.setattr(cold_store, "_segment_paths", lambda user_id: next(listings))
+    assert [post.id for post in cold_store.list_by_user(1, limit=1)] == [2]
@@ -0,0 +1,68 @@
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+import db
+from cache import cache
+from repositories.memory import MemoryPostRepository
+from services.post_service import PostService
+from utils.consistency import READ_YOUR_WRITES_COOKIE, ReadYourWritesMiddleware, decode_last_write, encode_last_write
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/write")
+    async def write():
+        db.mark_write("user:1")
+        return {}
+
+    @app.get("/read")
+    async def read():
+        # Simulates a worker that never saw the write
+        db._recent_writers.clear()
+        session = Session()
+        db.route_reads(session, "user:1")
+        return {"use_primary": session.info.get("use_primary", False)}
+
+    return TestClient(app)
+
+def test_write_sets_signed_cookie(client):
+    response = client.post("/write")
+    last_write = decode_last_write(response.cookies[READ_YOUR_WRITES_COOKIE])
+    assert last_write == pytest.approx(time.time(), abs=5)
+
+def test_read_does_not_set_cookie(client):
+    response = client.get("/read")
+    assert READ_YOUR_WRITES_COOKIE not in response.cookies
+    assert response.json() == {"use_primary": False}
+
+def test_reads_after_write_go_to_primary_on_any_worker(client):
+    client.post("/write")
+    assert client.get("/read").json() == {"use_primary": True}
+
+def test_pin_expires(client):
+    client.cookies.set(READ_YOUR_WRITES_COOKIE, encode_last_write(time.time() - db.READ_YOUR_WRITES_SECONDS - 1))
+    assert client.get("/read").json() == {"use_primary": False}
+
+def test_forged_cookie_is_ignored(client):
+    client.cookies.set(READ_YOUR_WRITES_COOKIE, f"{time.time():.6f}.forged")
+    assert client.get("/read").json() == {"use_primary": False}
+
+def test_cached_posts_older_than_client_write_are_reloaded():
+    repository = MemoryPostRepository()
+    post_service = PostService(repository=repository)
+    cache.pop("user_posts:1", None)
+    first = repository.add(1, "first")
+    assert [post.id for post in post_service._get_user_posts(1)] == [first.id]
+
+    # Written through another worker: this worker's cache entry was not invalidated
+    second = repository.add(1, "second")
+    assert [post.id for post in post_service._get_user_posts(1)] == [first.id]
+    token = db.request_writes.set({"last_write": time.time(), "wrote": False})
+    try:
+        assert [post.id for post in post_service._get_user_posts(1)] == [second.id, first.id]
+    finally:
+        db.request_writes.reset(token)
@@ -0,0 +1,108 @@
+import argparse
+import json
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+import load_data
+from database import Base
+from db import create_db_engine
+from models.post import Post
+from models.user import User
+
+@pytest.fixture
+def target(tmp_path) -> str:
+    url = f"sqlite:///{tmp_path / 'load.db'}"
+    Base.metadata.create_all(bind=create_db_engine(url))
+    load_data._init_worker(url)
+    return url
+
+def import_args(tmp_path, target: str, **overrides) -> argparse.Namespace:
+    users_file = tmp_path / "users.ndjson"
+    if not users_file.exists():
+        users_file.write_text("".join(json.dumps({"email": f"user{number}@example.com"}) + "\n" for number in range(3)))
+    values = {"command": "import", "target": target, "batch_size": 2, "checkpoint": None,
+              "users_file": str(users_file), "posts_file": None}
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+def user_count() -> int:
+    with load_data._engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(User.__table__)).scalar()
+
+def test_checkpoint_is_refused_for_a_different_load(tmp_path, target):
+    args = import_args(tmp_path, target)
+    load = load_data._describe_load(args)
+    path = str(tmp_path / "checkpoint.json")
+    load_data.Checkpoint(path, load).mark_done("users", 0)
+    assert load_data.Checkpoint(path, load).done("users") == {0}
+
+    with pytest.raises(SystemExit):
+        load_data.Checkpoint(path, load_data._describe_load(import_args(tmp_path, target, batch_size=3)))
+
+def test_default_checkpoint_path_depends_on_the_load(tmp_path, target):
+    args = import_args(tmp_path, target)
+    other_file = tmp_path / "other.ndjson"
+    other_file.write_text("")
+    first = load_data._checkpoint_path(args, load_data._describe_load(args))
+    other = import_args(tmp_path, target, users_file=str(other_file))
+    assert first != load_data._checkpoint_path(other, load_data._describe_load(other))
+    assert load_data._checkpoint_path(import_args(tmp_path, target, checkpoint="mine.json"), {}) == "mine.json"
+
+def test_import_duplicates_are_rejected_row_by_row(target):
+    load_data._insert_batch("users", [{"email": "taken@example.com", "hashed_password": "x"}])
+    inserted, rejected = load_data._convert_and_insert("users", [
+        {"email": "new@example.com"}, {"email": "taken@example.com"}, {"email": "other@example.com"},
+    ], first_id=10, now=0, resuming=False)
+    assert inserted == 2
+    assert [index for index, _ in rejected] == [1]
+    assert user_count() == 3
+
+def test_rows_without_ids_get_deterministic_ids_and_times():
+    rows = [{"user_id": "1", "text": "a"}, {"id": "7", "user_id": "1", "text": "b"}, {"user_id": "2", "text": "c"}]
+    converted = load_data._convert_rows("posts", rows, first_id=100, now=1.7e9)
+    assert [row["id"] for row in converted] == [100, 7, 102]
+    assert converted == load_data._convert_rows("posts", rows, first_id=100, now=1.7e9)
+
+def test_resumed_import_does_not_duplicate_or_reject_loaded_rows(target):
+    chunk = [{"user_id": "1", "text": f"post {number}"} for number in range(3)]
+    # An interrupted run committed the batch but never recorded it as done
+    assert load_data._convert_and_insert("posts", chunk, first_id=1, now=1.7e9, resuming=False) == (3, [])
+    assert load_data._convert_and_insert("posts", chunk, first_id=1, now=1.7e9, resuming=True) == (0, [])
+    with load_data._engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(Post.__table__)).scalar() == 3
+
+def test_resumed_import_still_rejects_conflicting_rows(target):
+    load_data._insert_batch("users", [{"id": 1, "email": "someone@example.com", "hashed_password": "x"}])
+    inserted, rejected = load_data._convert_and_insert(
+        "users", [{"email": "else@example.com"}, {"email": "new@example.com"}], first_id=1, now=0, resuming=True,
+    )
+    assert inserted == 1
+    assert [index for index, _ in rejected] == [0]
+
+def test_interrupted_import_resumes_without_duplicates(tmp_path, target, capsys):
+    args = import_args(tmp_path, target, workers=1, checkpoint=str(tmp_path / "checkpoint.json"))
+    load_data.import_files(args)
+    assert user_count() == 3
+
+    # Interrupted after batch 0 committed, before it was recorded as done
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    checkpoint["users"] = {"done": [1], "started": [0]}
+    (tmp_path / "checkpoint.json").write_text(json.dumps(checkpoint))
+    capsys.readouterr()
+
+    load_data.import_files(args)
+    assert user_count() == 3
+    assert "rejected" not in capsys.readouterr().err
+    assert load_data.Checkpoint(args.checkpoint, load_data._describe_load(args)).done("users") == {0, 1}
+
+def test_generated_batch_already_committed_counts_as_done(target):
+    rows = load_data._generate_users(0, 5, 5, 1)
+    assert load_data._insert_batch("users", rows, generated=True) == (5, [])
+    assert load_data._insert_batch("users", rows, generated=True) == (0, [])
+    assert user_count() == 5
+
+def test_generated_batch_conflicting_with_other_rows_fails(target):
+    load_data._insert_batch("users", [{"id": 3, "email": "someone@example.com", "hashed_password": "x"}])
+    with pytest.raises(IntegrityError):
+        load_data._insert_batch("users", load_data._generate_users(0, 5, 5, 1), generated=True)
+    assert user_count() == 1
@@ -0,0 +1,46 @@
+from sqlalchemy import inspect
+from sqlalchemy.dialects import mysql
+from db import create_db_engine
+from migrate import _index_post_user_ids, _widen_post_ids, migrate
+
+def test_migrates_original_posts_table(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(255), hashed_password VARCHAR(255))")
+        connection.exec_driver_sql(
+            "CREATE TABLE posts (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users (id), text TEXT, created_at DATETIME)"
+        )
+    assert migrate(engine) == ["posts.deleted_at", "posts.user_id index"]
+    indexes = {index["name"]: index["column_names"] for index in inspect(engine).get_indexes("posts")}
+    assert indexes["ix_posts_user_id"] == ["user_id"]
+    assert "deleted_at" in {column["name"] for column in inspect(engine).get_columns("posts")}
+    assert migrate(engine) == []
+
+def test_missing_table_is_skipped(tmp_path):
+    assert migrate(create_db_engine(f"sqlite:///{tmp_path / 'empty.db'}")) == []
+
+class MySqlSchema:
+    """
+    Reflection results of the original MySQL posts table (INT id, foreign key on user_id).
+    """
+    def __init__(self, id_type):
+        self.id_type = id_type
+
+    def get_columns(self, table):
+        return [{"name": "id", "type": self.id_type}, {"name": "user_id", "type": mysql.INTEGER()}]
+
+    def get_foreign_keys(self, table):
+        return [{"name": "posts_ibfk_1", "constrained_columns": ["user_id"], "referred_table": "users"}]
+
+    def get_indexes(self, table):
+        return [{"name": "user_id", "column_names": ["user_id"]}]
+
+def test_mysql_post_ids_are_widened_to_bigint():
+    assert _widen_post_ids(MySqlSchema(mysql.INTEGER()), "mysql") == ["ALTER TABLE posts MODIFY id BIGINT NOT NULL AUTO_INCREMENT"]
+    assert _widen_post_ids(MySqlSchema(mysql.BIGINT()), "mysql") == []
+
+def test_mysql_user_id_foreign_key_becomes_an_index():
+    assert _index_post_user_ids(MySqlSchema(mysql.INTEGER()), "mysql") == [
+        "ALTER TABLE posts DROP FOREIGN KEY posts_ibfk_1",
+        "CREATE INDEX ix_posts_user_id ON posts (user_id)",
+    ]
@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+import repositories.sql
+from db import create_db_engine
+from models.post import Post
+from models.shard_directory import ShardDirectory
+from repositories.memory import MemoryPostRepository
+from repositories.sharded import ShardedPostRepository, SnowflakeIds
+from repositories.sql import SqlPostRepository
+
+# Conformance suite: every PostRepository backend must pass the same tests.
+
+def sqlite_session_factory(path):
+    engine = create_db_engine(f"sqlite:///{path}")
+    Post.__table__.create(bind=engine, checkfirst=True)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(params=["memory", "sqlite", "sqlite_soft_delete", "sharded"])
+def repository(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        return MemoryPostRepository()
+    if request.param in ("sqlite", "sqlite_soft_delete"):
+        monkeypatch.setattr(repositories.sql, "SOFT_DELETE", request.param == "sqlite_soft_delete")
+        return SqlPostRepository(sqlite_session_factory(tmp_path / "posts.db"))
+    shards = [sqlite_session_factory(tmp_path / f"shard{number}.db") for number in range(2)]
+    directory_engine = create_db_engine(f"sqlite:///{tmp_path / 'shard0.db'}")
+    ShardDirectory.__table__.create(bind=directory_engine, checkfirst=True)
+    directory = sessionmaker(autocommit=False, autoflush=False, bind=directory_engine)
+    return ShardedPostRepository(shards, directory, SnowflakeIds(worker_id=1))
+
+def test_add_returns_stored_record(repository):
+    post = repository.add(1, "hello")
+    assert post.id is not None
+    assert (post.user_id, post.text) == (1, "hello")
+    assert post.created_ts > 0
+    assert [stored.id for stored in repository.list_by_user(1)] == [post.id]
+
+def test_add_generates_unique_ids(repository):
+    ids = {repository.add(user_id, "post").id for user_id in (1, 2, 3) for _ in range(5)}
+    assert len(ids) == 15
+
+def test_list_by_user_is_latest_first(repository):
+    posts = [repository.add(1, f"post {number}") for number in range(5)]
+    listed = repository.list_by_user(1)
+    assert [post.id for post in listed] == [post.id for post in reversed(posts)]
+    assert [post.text for post in listed] == [f"post {number}" for number in reversed(range(5))]
+
+def test_list_by_user_only_returns_own_posts(repository):
+    own = repository.add(1, "mine")
+    repository.add(2, "theirs")
+    assert [post.id for post in repository.list_by_user(1)] == [own.id]
+    assert repository.list_by_user(3) == []
+
+def test_delete_removes_own_post(repository):
+    kept = repository.add(1, "keep")
+    deleted = repository.add(1, "delete")
+    assert repository.delete(deleted.id, 1) is True
+    assert [post.id for post in repository.list_by_user(1)] == [kept.id]
+
+def test_delete_checks_ownership(repository):
+    post = repository.add(1, "mine")
+    assert repository.delete(post.id, 2) is False
+    assert [stored.id for stored in repository.list_by_user(1)] == [post.id]
+
+def test_delete_missing_id(repository):
+    post = repository.add(1, "mine")
+    assert repository.delete(post.id + 1000, 1) is False
+
+def test_delete_twice(repository):
+    post = repository.add(1, "mine")
+    assert repository.delete(post.id, 1) is True
+    assert repository.delete(post.id, 1) is False
+    assert repository.list_by_user(1) == []
+
+def test_top_authors(repository):
+    for user_id, count in ((1, 1), (2, 3), (3, 2)):
+        for _ in range(count):
+            repository.add(user_id, "post")
+    assert repository.top_authors(2) == [2, 3]
+
+def test_purge_deleted(repository):
+    post = repository.add(1, "mine")
+    repository.delete(post.id, 1)
+    repository.purge_deleted(batch_size=10)
+    assert repository.list_by_user(1) == []
+    assert repository.purge_deleted(batch_size=10) == 0
+
+def test_list_by_user_limit_returns_latest(repository):
+    posts = [repository.add(1, f"post {number}") for number in range(5)]
+    assert [post.id for post in repository.list_by_user(1, limit=2)] == [posts[4].id, posts[3].id]
+    assert len(repository.list_by_user(1, limit=10)) == 5
+    assert repository.list_by_user(1, limit=0) == []
+
+def test_recent_authors_only_ranks_newest_posts(repository):
+    for _ in range(3):
+        repository.add(1, "old")
+    for user_id in (2, 3, 2):
+        repository.add(user_id, "new")
+    assert repository.recent_authors(2, window=3) == [2, 3]
+    assert repository.recent_authors(1, window=100) == [1]
+
+def test_delete_archived_only_deletes_listed_posts(repository):
+    archived = repository.add(1, "archived")
+    gone = repository.add(1, "deleted meanwhile")
+    newer = repository.add(1, "written meanwhile")
+    repository.delete(gone.id, 1)
+    assert repository.delete_archived(1, {archived.id, gone.id}) == {archived.id}
+    assert [post.id for post in repository.list_by_user(1)] == [newer.id]
@@ -0,0 +1,37 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import utils.profiling
+from utils.profiling import ProfilingMiddleware
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils.profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(utils.profiling, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(utils.profiling, "PROFILE_SUMMARY", True)
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"pong": True}
+
+    return TestClient(app)
+
+def test_summary_is_returned_for_valid_token(client, tmp_path):
+    response = client.get("/ping", headers={"X-Profile": "secret"})
+    assert response.json() == {"pong": True}
+    assert response.headers["x-profile-summary"].startswith("total=")
+    assert len(list(tmp_path.iterdir())) == 1
+
+def test_invalid_token_is_not_profiled(client, tmp_path):
+    response = client.get("/ping", headers={"X-Profile": "wrong"})
+    assert "x-profile-summary" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+def test_sampled_request_gets_no_summary(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.profiling, "PROFILE_SAMPLE_RATE", 1.0)
+    response = client.get("/ping")
+    assert response.json() == {"pong": True}
+    assert "x-profile-summary" not in response.headers
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+import utils.serialization
+from main import app
+from repositories.base import PostRecord
+from schemas.user import UserOut
+from utils.serialization import FastJSONResponse
+
+# FastJSONResponse must render exactly the bytes of FastAPI's regular path:
+# response_model validation, jsonable_encoder, then JSONResponse.
+
+POSTS = [
+    PostRecord(1, 7, "hello", datetime(2024, 5, 1, 12, 30, 15, 123456).timestamp()),
+    PostRecord(2, 7, "no microseconds", datetime(2024, 5, 1, 12, 30, 15).timestamp()),
+    PostRecord(3, 8, "unicode: żółć 日本 🎉  ", datetime(2023, 1, 1).timestamp()),
+    PostRecord(4, 8, 'quotes " \\ and control \n\t\x01 chars', datetime(2024, 12, 31, 23, 59, 59, 999999).timestamp()),
+    PostRecord(2**62 + 12345, 2**31 - 1, "", datetime(2024, 2, 29, 0, 0, 0, 1).timestamp()), # Snowflake-sized ID
+]
+USER = UserOut(id=42, email="someone@example.com", token="a.b.c")
+
+def route(path: str, method: str):
+    return next(route for route in app.routes if route.path == path and method in route.methods)
+
+def regular_body(path: str, method: str, content) -> bytes:
+    encoded = asyncio.run(serialize_response(field=route(path, method).response_field, response_content=content))
+    return JSONResponse(encoded).body
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(utils.serialization, "orjson", None)
+    return request.param
+
+@pytest.mark.parametrize("path", ["/posts", "/timeline"])
+def test_post_lists_match_regular_path(encoder, path):
+    expected = regular_body(path, "GET", [post.to_post_out() for post in POSTS])
+    assert FastJSONResponse(POSTS).body == expected
+
+def test_created_post_matches_regular_path(encoder):
+    post = POSTS[0].to_post_out()
+    assert FastJSONResponse(post).body == regular_body("/posts", "POST", post)
+
+@pytest.mark.parametrize("path", ["/signup", "/login"])
+def test_user_matches_regular_path(encoder, path):
+    assert FastJSONResponse(USER).body == regular_body(path, "POST", USER)
+
+def test_empty_list_matches_regular_path(encoder):
+    assert FastJSONResponse([]).body == regular_body("/posts", "GET", [])
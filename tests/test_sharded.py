@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+import repositories.factory
+from db import create_db_engine
+from models.post import Post
+from models.shard_directory import ShardDirectory
+from repositories.sharded import ShardedPostRepository, SnowflakeIds
+
+def sqlite_session_factory(path):
+    engine = create_db_engine(f"sqlite:///{path}")
+    Post.__table__.create(bind=engine, checkfirst=True)
+    ShardDirectory.__table__.create(bind=engine, checkfirst=True)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def repository(tmp_path):
+    shards = [sqlite_session_factory(tmp_path / f"shard{number}.db") for number in range(2)]
+    return ShardedPostRepository(shards, shards[0], SnowflakeIds(worker_id=1))
+
+def test_top_authors_merges_shards_by_count(repository):
+    # Shard 0 holds the three most active authors, shard 1 two minor ones
+    for user_id, shard, count in ((1, 0, 5), (2, 0, 4), (3, 0, 3), (4, 1, 2), (5, 1, 1)):
+        repository._set_directory(user_id, shard, None)
+        for _ in range(count):
+            repository.add(user_id, "post")
+    assert repository.top_authors(3) == [1, 2, 3]
+    assert repository.top_authors(5) == [1, 2, 3, 4, 5]
+
+def test_worker_id_must_be_in_range():
+    with pytest.raises(ValueError):
+        SnowflakeIds(worker_id=1024)
+
+def test_ids_are_unique_and_increasing():
+    ids = SnowflakeIds(worker_id=7)
+    generated = [ids.next_id() for _ in range(10000)]
+    assert generated == sorted(set(generated))
+
+def test_sharded_backend_requires_worker_id(monkeypatch, tmp_path):
+    monkeypatch.setattr(repositories.factory, "POST_SHARD_URLS", [f"sqlite:///{tmp_path / 'shard0.db'}"])
+    monkeypatch.setattr(repositories.factory, "POST_ID_WORKER_ID", "")
+    with pytest.raises(ValueError):
+        repositories.factory.create_sharded_post_repository()
+
+    repository = repositories.factory.create_sharded_post_repository(for_writes=False)
+    with pytest.raises(RuntimeError):
+        repository.add(1, "post")
+
+    monkeypatch.setattr(repositories.factory, "POST_ID_WORKER_ID", "3")
+    assert repositories.factory.create_sharded_post_repository().add(1, "post").id is not None
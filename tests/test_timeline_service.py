@@ -0,0 +1,101 @@
+import asyncio
+from contextlib import contextmanager
+import jwt
+import pytest
+from cachetools import TTLCache
+from fastapi import HTTPException
+from sqlalchemy import delete, insert
+import services.timeline_service
+from auth import ALGORITHM, SECRET_KEY
+from db import engine
+from models.user import User
+from repositories.follows import MemoryFollowRepository
+from repositories.memory import MemoryPostRepository
+from services.timeline_service import TimelineService
+
+@pytest.fixture
+def timelines(monkeypatch):
+    monkeypatch.setattr(services.timeline_service, "_timelines", TTLCache(maxsize=100, ttl=60))
+    monkeypatch.setattr(services.timeline_service, "_follower_counts", TTLCache(maxsize=100, ttl=60))
+    with engine.begin() as connection:
+        connection.execute(delete(User))
+        connection.execute(insert(User), [{"id": user_id, "email": f"user{user_id}@example.com", "hashed_password": "x"} for user_id in (1, 2, 3)])
+    return TimelineService(post_repository=MemoryPostRepository(), follow_repository=MemoryFollowRepository())
+
+def token(user_id: int) -> str:
+    return jwt.encode({"sub": str(user_id)}, SECRET_KEY, algorithm=ALGORITHM)
+
+def test_follow_unknown_user_is_404(timelines):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(timelines.follow(999, token(1)))
+    assert error.value.status_code == 404
+    assert timelines.follow_repository.followees(1) == []
+
+def test_timeline_shows_followed_posts_newest_first(timelines):
+    asyncio.run(timelines.follow(2, token(1)))
+    asyncio.run(timelines.get_timeline(token(1))) # Builds the precomputed timeline
+    posts = [timelines.post_repository.add(author_id, "post") for author_id in (2, 3, 2)]
+    for post in posts:
+        timelines.fan_out_post(post)
+    timeline = asyncio.run(timelines.get_timeline(token(1)))
+    assert [post.id for post in timeline] == [posts[2].id, posts[0].id]
+
+def test_pull_authors_are_read_with_limit(timelines, monkeypatch):
+    monkeypatch.setattr(services.timeline_service, "FANOUT_MAX_FOLLOWERS", 0)
+    asyncio.run(timelines.follow(2, token(1)))
+    posts = [timelines.post_repository.add(2, f"post {number}") for number in range(5)]
+    timelines.fan_out_post(posts[-1])
+    timeline = asyncio.run(timelines.get_timeline(token(1), limit=3))
+    assert [post.id for post in timeline] == [post.id for post in reversed(posts)][:3]
+
+class Worker:
+    """
+    The per-process timeline state of one API worker, with a controllable clock.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self.timelines = TTLCache(maxsize=100, ttl=60, timer=lambda: self.now)
+        self.follower_counts = TTLCache(maxsize=100, ttl=60, timer=lambda: self.now)
+
+    @contextmanager
+    def active(self, monkeypatch):
+        with monkeypatch.context() as patch:
+            patch.setattr(services.timeline_service, "_timelines", self.timelines)
+            patch.setattr(services.timeline_service, "_follower_counts", self.follower_counts)
+            yield
+
+def test_timelines_hold_refs_not_texts(timelines):
+    asyncio.run(timelines.follow(2, token(1)))
+    timelines.post_repository.add(2, "x" * 1000)
+    asyncio.run(timelines.get_timeline(token(1)))
+    assert all(not hasattr(ref, "text") for ref in services.timeline_service._timelines[1])
+
+def test_delete_on_one_worker_is_seen_by_the_others(timelines, monkeypatch):
+    first, second = Worker(), Worker()
+    asyncio.run(timelines.follow(2, token(1)))
+    kept = timelines.post_repository.add(2, "kept")
+    deleted = timelines.post_repository.add(2, "deleted")
+    for worker in (first, second):
+        with worker.active(monkeypatch):
+            assert [post.id for post in asyncio.run(timelines.get_timeline(token(1)))] == [deleted.id, kept.id]
+
+    # The delete is handled by the first worker; the second one still has the post's ref
+    with first.active(monkeypatch):
+        timelines.post_repository.delete(deleted.id, 2)
+        timelines.remove_post(2, deleted.id)
+    with second.active(monkeypatch):
+        assert [post.id for post in asyncio.run(timelines.get_timeline(token(1)))] == [kept.id]
+        assert [ref.id for ref in second.timelines[1]] == [kept.id]
+
+def test_post_fanned_out_on_another_worker_shows_up_after_ttl(timelines, monkeypatch):
+    first, second = Worker(), Worker()
+    asyncio.run(timelines.follow(2, token(1)))
+    with second.active(monkeypatch):
+        assert asyncio.run(timelines.get_timeline(token(1))) == []
+    with first.active(monkeypatch):
+        post = timelines.post_repository.add(2, "new")
+        timelines.fan_out_post(post)
+
+    second.now += 61
+    with second.active(monkeypatch):
+        assert [stored.id for stored in asyncio.run(timelines.get_timeline(token(1)))] == [post.id]
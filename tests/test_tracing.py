@@ -0,0 +1,97 @@
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+import utils.tracing
+from db import create_db_engine
+from utils.tracing import JsonFileExporter, SqlTracingMiddleware, fingerprint, install_sql_tracing, memory_collector, traced
+
+@pytest.fixture
+def tracing(monkeypatch):
+    # As with SQL_TRACE_EXPORT=memory
+    monkeypatch.setattr(utils.tracing, "exporter", memory_collector)
+    memory_collector.clear()
+    install_sql_tracing()
+    yield memory_collector
+    event.remove(Engine, "before_cursor_execute", utils.tracing._before_cursor_execute)
+    event.remove(Engine, "after_cursor_execute", utils.tracing._after_cursor_execute)
+    event.remove(Engine, "commit", utils.tracing._commit)
+    memory_collector.clear()
+
+class Authors:
+    def __init__(self, engine):
+        self.engine = engine
+
+    @traced
+    async def names(self, count: int) -> list:
+        # One query per author: the N+1 pattern the tracer should flag
+        with self.engine.connect() as connection:
+            return [connection.execute(text(f"SELECT {author_id} AS id")).scalar() for author_id in range(count)]
+
+@pytest.fixture
+def client(tmp_path):
+    authors = Authors(create_db_engine(f"sqlite:///{tmp_path / 'trace.db'}"))
+    app = FastAPI()
+    app.add_middleware(SqlTracingMiddleware)
+
+    @app.get("/authors")
+    async def list_authors(count: int = 1):
+        return await authors.names(count)
+
+    return TestClient(app)
+
+def test_span_tree_and_query_count(tracing, client):
+    assert client.get("/authors?count=2").json() == [0, 1]
+    [trace] = tracing.traces
+    assert trace["query_count"] == 2
+    assert trace["flags"] == []
+
+    request = trace["span"]
+    assert (request["name"], request["kind"]) == ("GET /authors", "request")
+    [service] = request["children"]
+    assert (service["name"], service["kind"]) == ("Authors.names", "service")
+    assert [child["kind"] for child in service["children"]] == ["sql", "sql"]
+    assert service["children"][0]["statement"] == "SELECT 0 AS id"
+
+def test_repeated_statements_are_flagged(tracing, client, monkeypatch):
+    monkeypatch.setattr(utils.tracing, "SQL_TRACE_MAX_QUERIES", 100)
+    client.get(f"/authors?count={utils.tracing.SQL_TRACE_MAX_REPEATS + 1}")
+    [trace] = tracing.traces
+    assert trace["flags"] == [f"repeated_statement:{fingerprint('SELECT 0 AS id')}x{utils.tracing.SQL_TRACE_MAX_REPEATS + 1}"]
+
+def test_query_count_is_flagged(tracing, client, monkeypatch):
+    monkeypatch.setattr(utils.tracing, "SQL_TRACE_MAX_QUERIES", 2)
+    monkeypatch.setattr(utils.tracing, "SQL_TRACE_MAX_REPEATS", 100)
+    client.get("/authors?count=3")
+    assert tracing.traces[0]["flags"] == ["query_count>2"]
+
+def test_no_trace_outside_requests(tracing, tmp_path):
+    with create_db_engine(f"sqlite:///{tmp_path / 'plain.db'}").connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert tracing.traces == []
+
+def test_fingerprint_normalizes_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM posts WHERE id = 1") == fingerprint("select *  from posts\nwhere id = 42")
+    assert fingerprint("SELECT * FROM users WHERE email = 'a@b.c'") == fingerprint("SELECT * FROM users WHERE email = 'it''s'")
+    assert fingerprint("SELECT * FROM posts WHERE price > 1.5") == fingerprint("SELECT * FROM posts WHERE price > %s")
+    assert fingerprint("SELECT * FROM posts WHERE id IN (1, 2, 3)") == fingerprint("SELECT * FROM posts WHERE id IN (?)")
+    assert fingerprint("SELECT * FROM posts WHERE id IN (%(id_1)s, %(id_2)s)") == fingerprint("SELECT * FROM posts WHERE id IN (7)")
+    assert fingerprint("SELECT * FROM posts WHERE id = 1") != fingerprint("SELECT * FROM users WHERE id = 1")
+
+def test_file_exporter_writes_in_the_background(tmp_path):
+    exporter = JsonFileExporter(str(tmp_path / "traces" / "sql.jsonl"))
+    for number in range(5):
+        exporter.export({"query_count": number})
+    exporter.flush()
+    lines = (tmp_path / "traces" / "sql.jsonl").read_text().splitlines()
+    assert [json.loads(line)["query_count"] for line in lines] == list(range(5))
+    assert exporter._writer.daemon
+
+def test_file_exporter_drops_traces_when_full(tmp_path):
+    exporter = JsonFileExporter(str(tmp_path / "sql.jsonl"), max_queued=1)
+    exporter._writer = object() # No writer thread: the queue is never drained
+    exporter.export({})
+    exporter.export({})
+    assert exporter.dropped == 1
@@ -0,0 +1,88 @@
+import asyncio
+import bcrypt
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+import db
+from cache import user_lookup_cache, user_lookup_negative_cache
+from models.user import User
+from schemas.user import UserCreate, UserLogin
+from services.user_service import UserService
+
+@pytest.fixture(autouse=True)
+def clean_users(monkeypatch):
+    # Cheap bcrypt rounds keep the tests fast; the hash format is unchanged
+    gensalt = bcrypt.gensalt
+    monkeypatch.setattr(bcrypt, "gensalt", lambda: gensalt(4))
+    with db.engine.begin() as connection:
+        connection.execute(delete(User))
+    user_lookup_cache.clear()
+    user_lookup_negative_cache.clear()
+    db._recent_writers.clear()
+
+def signup(email: str, password: str = "secret-password"):
+    return asyncio.run(UserService().signup(UserCreate(email=email, password=password)))
+
+def login(email: str, password: str = "secret-password"):
+    return asyncio.run(UserService().login(UserLogin(email=email, password=password)))
+
+def test_signup_is_a_single_insert(count_queries):
+    with count_queries(db.engine) as statements:
+        user = signup("alice@example.com")
+    assert user.id is not None
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith("INSERT")
+
+def test_duplicate_signup_is_rejected_in_one_round_trip(count_queries):
+    signup("alice@example.com")
+    with count_queries(db.engine) as statements:
+        with pytest.raises(HTTPException) as error:
+            signup("alice@example.com")
+    assert error.value.status_code == 400
+    assert len(statements) == 1
+
+def test_login_after_signup_is_served_from_cache(count_queries):
+    user = signup("alice@example.com")
+    with count_queries(db.engine) as statements:
+        assert login("alice@example.com").id == user.id
+    assert statements == []
+
+def test_login_queries_once_then_uses_cache(count_queries):
+    user = signup("alice@example.com")
+    user_lookup_cache.clear()
+    with count_queries(db.engine) as statements:
+        assert login("alice@example.com").id == user.id
+        assert login("alice@example.com").id == user.id
+    assert len(statements) == 1
+
+def test_wrong_password_is_rejected():
+    signup("alice@example.com")
+    with pytest.raises(HTTPException) as error:
+        login("alice@example.com", "wrong-password")
+    assert error.value.status_code == 401
+
+def test_unknown_email_is_cached_as_negative_entry(count_queries):
+    with count_queries(db.engine) as statements:
+        for _ in range(3):
+            with pytest.raises(HTTPException) as error:
+                login("nobody@example.com")
+            assert error.value.status_code == 401
+    assert len(statements) == 1
+
+def test_signup_replaces_negative_entry():
+    with pytest.raises(HTTPException):
+        login("alice@example.com")
+    user = signup("alice@example.com")
+    assert login("alice@example.com").id == user.id
+
+def test_unknown_email_read_from_replica_is_not_cached(monkeypatch, count_queries, test_dir):
+    replica = db.create_db_engine(f"sqlite:///{test_dir}/replica.db")
+    User.__table__.create(bind=replica, checkfirst=True)
+    monkeypatch.setattr(db, "replica_engines", [replica])
+
+    with count_queries(replica) as statements:
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                login("nobody@example.com")
+    assert len(statements) == 2
+    assert "nobody@example.com" not in user_lookup_negative_cache
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+import utils.warmup
+from main import app
+from utils.warmup import run_warmup
+
+@pytest.fixture
+def warmup_state(monkeypatch):
+    state = {"ready": False, "phases": {}, "total_ms": None}
+    monkeypatch.setattr(utils.warmup, "warmup_state", state)
+    monkeypatch.setattr("main.warmup_state", state)
+    return state
+
+def test_readyz_is_503_until_warmup_finishes(warmup_state, monkeypatch):
+    monkeypatch.setattr(utils.warmup, "WARMUP_PHASES", [("db_pool", lambda: None), ("serialization", lambda: None)])
+    client = TestClient(app) # Not entered: startup handlers (and the real warmup) don't run
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+    asyncio.run(run_warmup())
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert set(body["phases"]) == {"db_pool", "serialization"}
+    assert all(isinstance(duration, float) for duration in body["phases"].values())
+    assert body["total_ms"] >= 0
+
+def test_disabled_phases_are_skipped(warmup_state, monkeypatch):
+    ran = []
+    monkeypatch.setattr(utils.warmup, "WARMUP_PHASES", [
+        (name, lambda name=name: ran.append(name)) for name in ("db_pool", "serialization", "cache")
+    ])
+    monkeypatch.setattr(utils.warmup, "WARMUP_DB_CONNECTIONS", 0)
+    monkeypatch.setattr(utils.warmup, "WARMUP_HOT_USERS", 0)
+    asyncio.run(run_warmup())
+    assert ran == ["serialization"]
+    assert set(warmup_state["phases"]) == {"serialization"}
+
+def test_failed_phase_is_recorded_and_worker_still_ready(warmup_state, monkeypatch):
+    def fail():
+        raise RuntimeError("database down")
+    monkeypatch.setattr(utils.warmup, "WARMUP_PHASES", [("db_pool", fail), ("serialization", lambda: None)])
+    asyncio.run(run_warmup())
+    assert warmup_state["ready"] is True
+    assert warmup_state["phases"]["db_pool"] == "failed: database down"
+
+def test_real_phases_run(warmup_state, monkeypatch):
+    monkeypatch.setattr(utils.warmup, "WARMUP_DB_CONNECTIONS", 2)
+    monkeypatch.setattr(utils.warmup, "WARMUP_HOT_USERS", 5)
+    asyncio.run(run_warmup())
+    assert all(isinstance(duration, float) for duration in warmup_state["phases"].values())
+    assert set(warmup_state["phases"]) == {"db_pool", "serialization", "cache"}
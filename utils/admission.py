@@ -0,0 +1,234 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+# --- Admission Control Configuration ---
+
+def _class_config(name: str, concurrency: int, queue: int, timeout: float) -> dict:
+    prefix = f"ADMISSION_{name.upper()}"
+    return {
+        "concurrency": int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+        "queue": int(os.getenv(f"{prefix}_QUEUE", str(queue))),
+        "timeout": float(os.getenv(f"{prefix}_TIMEOUT", str(timeout))),
+    }
+
+# Slots shared by all route classes. A freed slot goes to the highest-priority
+# class with waiting requests, so reads really are served ahead of writes and auth.
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", "64"))
+
+# Route classes in priority order (highest first). Cheap, mostly cached reads are
+# served before writes, and CPU-heavy bcrypt auth work is shed first. A class's
+# concurrency caps how many of the shared slots it may hold at once.
+ROUTE_CLASSES = {
+    "post_read": _class_config("post_read", concurrency=64, queue=256, timeout=1.0),
+    "post_write": _class_config("post_write", concurrency=32, queue=128, timeout=2.0),
+    "auth": _class_config("auth", concurrency=4, queue=16, timeout=2.0),
+}
+
+# Seconds clients are told to wait (Retry-After) when rejected
+ADMISSION_RETRY_AFTER = os.getenv("ADMISSION_RETRY_AFTER", "1")
+
+def classify(method: str, path: str):
+    """
+    Maps a request to its route class, or None for routes that bypass admission control
+    (health checks, metrics, docs).
+    """
+    if path in ("/signup", "/login"):
+        return "auth"
+    if path in ("/posts", "/timeline") and method == "GET":
+        return "post_read"
+    if path.startswith("/posts") or path.startswith("/follow"):
+        return "post_write"
+    return None
+
+# --- Limiter ---
+
+class Limiter:
+    """
+    A route class's share of the admission slots: its concurrency cap, bounded
+    FIFO wait queue, wait deadline and counters.
+    """
+
+    def __init__(self, concurrency: int, queue: int, timeout: float):
+        self.concurrency = concurrency
+        self.queue = queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.waiters = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def has_waiters(self) -> bool:
+        return any(not waiter.done() for waiter in self.waiters)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": sum(1 for waiter in self.waiters if not waiter.done()),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self.total_wait / max(self.admitted + self.timed_out, 1) * 1000, 2),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+class AdmissionController:
+    """
+    Hands out a fixed number of shared slots to route classes by priority.
+
+    A request is admitted right away if a slot is free, its class is under its
+    cap, no request of its own class is waiting and no higher-priority class has
+    a waiter that could use a shared slot. Waiters of a class held back only by
+    its own cap don't block other classes. Otherwise a request waits in its
+    class's queue; whenever a slot frees up it goes to the oldest waiter of the
+    highest-priority class that is under its cap.
+    """
+
+    def __init__(self, capacity: int, route_classes: dict):
+        self.capacity = capacity
+        self.in_flight = 0
+        # Dicts keep insertion order, which is the priority order of ROUTE_CLASSES
+        self.limiters = {name: Limiter(**config) for name, config in route_classes.items()}
+
+    def _can_take(self, limiter: Limiter) -> bool:
+        return self.in_flight < self.capacity and limiter.in_flight < limiter.concurrency
+
+    def higher_priority_waiting(self, name: str) -> bool:
+        """
+        Returns True if a class ranked above `name` has waiters that a free shared slot would go to.
+
+        Classes at their own concurrency cap are skipped: their waiters are only
+        waiting for a slot of their own class to be released.
+        """
+        for other_name, other in self.limiters.items():
+            if other_name == name:
+                return False
+            if other.has_waiters() and other.in_flight < other.concurrency:
+                return True
+        return False
+
+    def _take(self, limiter: Limiter):
+        self.in_flight += 1
+        limiter.in_flight += 1
+
+    async def acquire(self, name: str, may_queue: bool = True) -> bool:
+        """
+        Waits for a slot for a request of class `name`. Returns False if the queue is full or the deadline passes.
+        """
+        limiter = self.limiters[name]
+        if self._can_take(limiter) and not limiter.has_waiters() and not self.higher_priority_waiting(name):
+            self._take(limiter)
+            limiter.admitted += 1
+            return True
+        if not may_queue or len(limiter.waiters) >= limiter.queue:
+            limiter.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        limiter.waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), limiter.timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # Client went away; hand the slot on if it was already granted
+            self._abandon(name, waiter)
+            raise
+
+        waited = time.perf_counter() - started
+        limiter.total_wait += waited
+        limiter.max_wait = max(limiter.max_wait, waited)
+        if waiter.done():
+            limiter.admitted += 1
+            return True
+        self._abandon(name, waiter)
+        limiter.timed_out += 1
+        limiter.rejected += 1
+        return False
+
+    def _abandon(self, name: str, waiter):
+        if waiter.done():
+            self.release(name)
+        else:
+            waiter.cancel()
+            self.limiters[name].waiters.remove(waiter)
+
+    def release(self, name: str):
+        """
+        Frees a slot of class `name` and hands free slots to waiters, highest priority first.
+        """
+        self.in_flight -= 1
+        self.limiters[name].in_flight -= 1
+        for limiter in self.limiters.values():
+            while limiter.waiters and self._can_take(limiter):
+                waiter = limiter.waiters.popleft()
+                if not waiter.done():
+                    self._take(limiter) # The slot passes to the waiter
+                    waiter.set_result(True)
+            if self.in_flight >= self.capacity:
+                return
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            **{name: limiter.stats() for name, limiter in self.limiters.items()},
+        }
+
+admission = AdmissionController(ADMISSION_CAPACITY, ROUTE_CLASSES)
+
+def admission_stats() -> dict:
+    """
+    Returns shared slot usage and per-route-class queue depth, rejection and wait time counters.
+    """
+    return admission.stats()
+
+# --- Middleware ---
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that admits requests per route class and sheds load early.
+
+    Route classes share ADMISSION_CAPACITY slots (see AdmissionController); each
+    has its own cap and bounded wait queue. A request that cannot get a slot
+    before its class's deadline, or finds the queue full, gets an immediate 503
+    with Retry-After. While a higher-priority class has requests waiting for a
+    shared slot, lower-priority classes may not queue at all.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        route_class = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        may_queue = not admission.higher_priority_waiting(route_class)
+        if not await admission.acquire(route_class, may_queue):
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release(route_class)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "Server is overloaded, please retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", ADMISSION_RETRY_AFTER.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,81 @@
+import hashlib
+import hmac
+import time
+from http.cookies import SimpleCookie
+from auth import SECRET_KEY
+from cache import cache
+from db import READ_YOUR_WRITES_SECONDS, request_writes
+
+# --- Read-Your-Writes Cookie ---
+
+READ_YOUR_WRITES_COOKIE = "last_write"
+
+# The cookie outlives the primary pin so a worker can also tell that its cached
+# copy of the client's posts predates the write (see PostService._get_user_posts).
+READ_YOUR_WRITES_COOKIE_MAX_AGE = int(max(cache.ttl, READ_YOUR_WRITES_SECONDS))
+
+def _sign(value: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), value.encode(), hashlib.sha256).hexdigest()[:32]
+
+def encode_last_write(timestamp: float) -> str:
+    """
+    Returns the signed cookie value for a write at `timestamp` (epoch seconds).
+    """
+    value = f"{timestamp:.6f}"
+    return f"{value}.{_sign(value)}"
+
+def decode_last_write(cookie_value: str):
+    """
+    Returns the write time from a signed cookie value, or None if it is malformed or forged.
+    """
+    value, _, signature = cookie_value.rpartition(".")
+    if not value or not hmac.compare_digest(signature, _sign(value)):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware that lets clients carry their last write time between workers.
+
+    A response to a request that wrote sets a signed `last_write` cookie. On the
+    client's next requests, whichever worker handles them, reads are routed to the
+    primary for READ_YOUR_WRITES_SECONDS after that write, and cached data loaded
+    before it is refreshed. Clients that don't keep cookies fall back to the
+    per-process pin in db.py.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = {"last_write": self._last_write(scope), "wrote": False}
+        token = request_writes.set(state)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state["wrote"]:
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={encode_last_write(time.time())}; "
+                    f"Max-Age={READ_YOUR_WRITES_COOKIE_MAX_AGE}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_writes.reset(token)
+
+    def _last_write(self, scope):
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(READ_YOUR_WRITES_COOKIE)
+                if morsel is not None:
+                    return decode_last_write(morsel.value)
+        return None
@@ -0,0 +1,132 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import sys
+import time
+
+# --- Profiling Configuration ---
+
+# Directory where per-request profiles (.prof files, readable with pstats/snakeviz) are written
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+
+# Fraction of requests (0.0 - 1.0) that are profiled without being asked to
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# Secret that must be sent in the X-Profile header to profile a request on demand.
+# Header-triggered profiling is disabled when this is empty.
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+
+# Whether to return a short summary of the hottest functions in the X-Profile-Summary header.
+# Only sent to requests that carried a valid X-Profile token, never to sampled ones.
+PROFILE_SUMMARY = os.getenv("PROFILE_SUMMARY", "1") == "1"
+
+PROFILE_HEADER = b"x-profile"
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that runs cProfile for a single request.
+
+    A request is profiled when it carries a valid X-Profile header or is picked
+    by PROFILE_SAMPLE_RATE. The profile is written to PROFILE_DIR and, if enabled,
+    a summary is returned in the X-Profile-Summary response header of requests
+    that asked for the profile with a valid token (it names internal modules and
+    functions, so sampled clients never get it).
+
+    When a request is not profiled the only cost is a header lookup and (if sampling
+    is enabled) one random number. Only one request is profiled at a time; since the
+    profiler is attached to the event loop thread, coroutines of other requests that
+    run concurrently can also show up in the profile.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+        requested = self._has_valid_token(scope)
+        if not requested and not (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profiler = cProfile.Profile()
+        response_start = None
+
+        async def send_wrapper(message):
+            nonlocal response_start
+            # Hold back the response start until the body is complete so the
+            # summary header can still be added to it.
+            if message["type"] == "http.response.start":
+                response_start = message
+                return
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                self._finish(profiler, scope, response_start if requested else None)
+            if response_start is not None:
+                await send(response_start)
+                response_start = None
+            await send(message)
+
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._active = False
+            print(f"Profiled {scope['method']} {scope['path']} in {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+
+    def _has_valid_token(self, scope) -> bool:
+        """
+        Returns True if the request carries an X-Profile header matching PROFILE_TOKEN.
+        """
+        if PROFILE_TOKEN:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, PROFILE_TOKEN.encode())
+        return False
+
+    def _finish(self, profiler: cProfile.Profile, scope, response_start):
+        """
+        Stops the profiler, writes the profile to disk and attaches the summary header.
+
+        `response_start` is None for requests that must not get the summary (sampled ones).
+        """
+        profiler.disable()
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            name = f"{int(time.time() * 1000)}_{scope['method']}_{scope['path'].strip('/').replace('/', '_') or 'root'}.prof"
+            path = os.path.join(PROFILE_DIR, name)
+            profiler.dump_stats(path)
+            print(f"Request profile written to {path}", file=sys.stderr)
+
+            if PROFILE_SUMMARY and response_start is not None:
+                headers = list(response_start.get("headers", []))
+                headers.append((b"x-profile-summary", summarize_profile(profiler).encode("ascii", "replace")))
+                response_start["headers"] = headers
+        except Exception as e:
+            print(f"Failed to write request profile: {e}", file=sys.stderr)
+
+def summarize_profile(profiler: cProfile.Profile, limit: int = 5) -> str:
+    """
+    Summarizes the functions with the highest cumulative time in a profile.
+
+    Args:
+        profiler (cProfile.Profile): A finished profiler.
+        limit (int): The number of functions to include.
+
+    Returns:
+        str: A header-safe summary like "total=12.3ms; jwt.decode=1.2ms; ...".
+    """
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    parts = [f"total={stats.total_tt * 1000:.1f}ms"]
+    for (filename, line, function), (_, _, _, cumulative, _) in entries[:limit]:
+        module = os.path.splitext(os.path.basename(filename))[0] or "builtin"
+        parts.append(f"{module}.{function}:{line}={cumulative * 1000:.1f}ms")
+    return "; ".join(parts)
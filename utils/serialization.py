@@ -0,0 +1,52 @@
+import datetime
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError: # Optional dependency; fall back to the standard library encoder
+    orjson = None
+
+def _default(obj: Any) -> Any:
+    """
+    Encodes the types the JSON encoders don't handle natively.
+
+    Datetimes use isoformat(), exactly like FastAPI's jsonable_encoder, so the
+    output is identical to the regular response_model path.
+    """
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if hasattr(obj, "to_dict"): # e.g. PostRecord
+        return obj.to_dict()
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """
+    Serializes content to compact UTF-8 JSON, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson (or the stdlib fallback).
+
+    Endpoints can return this directly with content that is already valid for
+    their response model (pydantic models, PostRecords, plain dicts); FastAPI
+    then skips the response_model validation and jsonable_encoder passes.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
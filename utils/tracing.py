@@ -0,0 +1,282 @@
+import asyncio
+import contextvars
+import functools
+import hashlib
+import inspect
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+# --- SQL Tracing Configuration ---
+
+# Set SQL_TRACE=1 to trace SQL queries per request
+SQL_TRACE = os.getenv("SQL_TRACE", "0") == "1"
+
+# "memory" keeps traces in memory_collector (for tests); anything else is a JSON lines file path
+SQL_TRACE_EXPORT = os.getenv("SQL_TRACE_EXPORT", "./traces/sql_traces.jsonl")
+
+# A request is flagged when it runs more queries than this ...
+SQL_TRACE_MAX_QUERIES = int(os.getenv("SQL_TRACE_MAX_QUERIES", "10"))
+# ... or runs the same statement fingerprint more often than this (likely N+1)
+SQL_TRACE_MAX_REPEATS = int(os.getenv("SQL_TRACE_MAX_REPEATS", "3"))
+
+_current_span = contextvars.ContextVar("sql_trace_span", default=None)
+
+# --- Spans ---
+
+class Span:
+    """
+    A timed operation in a request's trace: the request itself, a service method or a SQL statement.
+    """
+    __slots__ = ("name", "kind", "start", "duration", "children", "attributes")
+
+    def __init__(self, name: str, kind: str, attributes: dict = None):
+        self.name = name
+        self.kind = kind
+        self.start = time.perf_counter()
+        self.duration = None
+        self.children = []
+        self.attributes = attributes or {}
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            **self.attributes,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|%s|:\w+|\?")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalizes a SQL statement so repeats differing only in parameters match.
+
+    Literals and bind parameters become '?', IN lists collapse to '(?+)' and
+    whitespace is collapsed. Returns a short hash of the normalized statement.
+    """
+    normalized = _LITERALS.sub("?", statement.lower())
+    normalized = _IN_LISTS.sub("(?+)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+# --- Exporters ---
+
+class InMemoryCollector:
+    """
+    Keeps finished traces in memory, e.g. to assert on query counts in tests.
+    """
+
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace: dict):
+        self.traces.append(trace)
+
+    def flush(self):
+        pass # Nothing buffered
+
+    def clear(self):
+        self.traces.clear()
+
+class JsonFileExporter:
+    """
+    Appends finished traces to a JSON lines file (one trace per line).
+
+    export() only queues the trace: a background thread encodes and writes queued
+    traces in batches, so requests never wait on file I/O. When the queue is
+    full (the disk can't keep up), traces are dropped and counted.
+    """
+
+    def __init__(self, path: str, max_queued: int = 10000):
+        self.path = path
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def export(self, trace: dict):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="sql-trace-writer", daemon=True)
+                    self._writer.start()
+
+    def flush(self):
+        """
+        Blocks until every queued trace has been written.
+        """
+        self._queue.join()
+
+    def _write_loop(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        while True:
+            traces = [self._queue.get()]
+            while True:
+                try:
+                    traces.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                lines = "".join(json.dumps(trace, default=str) + "\n" for trace in traces)
+                with open(self.path, "a") as trace_file:
+                    trace_file.write(lines)
+            except Exception as e:
+                print(f"Failed to write {len(traces)} SQL traces: {e}", file=sys.stderr)
+            finally:
+                for _ in traces:
+                    self._queue.task_done()
+
+memory_collector = InMemoryCollector()
+exporter = memory_collector if SQL_TRACE_EXPORT == "memory" else JsonFileExporter(SQL_TRACE_EXPORT)
+
+async def flush_traces():
+    """
+    Waits (off the event loop) until all exported traces are written, e.g. on shutdown.
+    """
+    await asyncio.get_running_loop().run_in_executor(None, exporter.flush)
+
+# --- Instrumentation ---
+
+def traced(method):
+    """
+    Records a span for a service method while a request is being traced.
+
+    Costs a single context variable lookup when tracing is off.
+    """
+    name = method.__qualname__
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None:
+                return await method(*args, **kwargs)
+            span = Span(name, "service")
+            parent.children.append(span)
+            token = _current_span.set(span)
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                span.finish()
+                _current_span.reset(token)
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        parent = _current_span.get()
+        if parent is None:
+            return method(*args, **kwargs)
+        span = Span(name, "service")
+        parent.children.append(span)
+        token = _current_span.set(span)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            span.finish()
+            _current_span.reset(token)
+    return wrapper
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is not None:
+        span = Span("sql", "sql", {"statement": statement, "fingerprint": fingerprint(statement), "database": conn.engine.url.database})
+        parent.children.append(span)
+        conn.info.setdefault("sql_trace_spans", []).append(span)
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("sql_trace_spans")
+    if spans:
+        spans.pop().finish()
+
+def _commit(conn):
+    parent = _current_span.get()
+    if parent is not None:
+        span = Span("sql", "sql", {"statement": "COMMIT", "fingerprint": "commit", "database": conn.engine.url.database})
+        span.finish()
+        parent.children.append(span)
+
+def install_sql_tracing():
+    """
+    Hooks SQLAlchemy's cursor execute and commit events for every engine.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "commit", _commit)
+
+def analyze(root: Span) -> dict:
+    """
+    Builds the exported trace for a finished request and flags query-count problems.
+    """
+    queries = [span for span in root.walk() if span.kind == "sql"]
+    repeats = Counter(span.attributes["fingerprint"] for span in queries)
+    flags = []
+    if len(queries) > SQL_TRACE_MAX_QUERIES:
+        flags.append(f"query_count>{SQL_TRACE_MAX_QUERIES}")
+    for statement_fingerprint, count in repeats.items():
+        if count > SQL_TRACE_MAX_REPEATS and statement_fingerprint != "commit":
+            flags.append(f"repeated_statement:{statement_fingerprint}x{count}")
+    return {
+        "timestamp": time.time(),
+        "query_count": len(queries),
+        "sql_ms": round(sum(span.duration or 0 for span in queries) * 1000, 3),
+        "flags": flags,
+        "span": root.to_dict(),
+    }
+
+class SqlTracingMiddleware:
+    """
+    ASGI middleware that builds a span tree of service calls and SQL statements per request.
+
+    Finished traces are exported to SQL_TRACE_EXPORT; requests with too many
+    queries or repeated statements are also reported on stderr.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root = Span(f"{scope['method']} {scope['path']}", "request")
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            root.finish()
+            _current_span.reset(token)
+            trace = analyze(root)
+            if trace["flags"]:
+                print(f"SQL trace flags for {root.name}: {', '.join(trace['flags'])}", file=sys.stderr)
+            try:
+                exporter.export(trace)
+            except Exception as e:
+                print(f"Failed to export SQL trace: {e}", file=sys.stderr)
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+# --- Warmup Configuration ---
+
+# Number of pooled database connections to open before the worker reports ready
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "5"))
+
+# Number of most active users whose post lists are preloaded into the cache
+WARMUP_HOT_USERS = int(os.getenv("WARMUP_HOT_USERS", "0"))
+
+# Activity is ranked over this many newest posts, so the preload query stays bounded
+WARMUP_RECENT_POSTS = int(os.getenv("WARMUP_RECENT_POSTS", "10000"))
+
+# --- Warmup State ---
+
+# Read by the /readyz endpoint; phases maps each phase name to its duration (ms) or error
+warmup_state = {"ready": False, "phases": {}, "total_ms": None}
+
+def _warm_db_pool():
+    """
+    Opens WARMUP_DB_CONNECTIONS connections on the primary and each replica so they sit in the pool.
+    """
+    import db
+
+    for engine in [db.engine, *db.replica_engines]:
+        pool_size = getattr(engine.pool, "size", None)
+        count = min(WARMUP_DB_CONNECTIONS, pool_size()) if callable(pool_size) else WARMUP_DB_CONNECTIONS
+        # Hold all connections at once so the pool really opens `count` of them
+        connections = []
+        try:
+            for _ in range(count):
+                connection = engine.connect()
+                connection.exec_driver_sql("SELECT 1")
+                connections.append(connection)
+        finally:
+            for connection in connections:
+                connection.close()
+
+def _warm_serialization():
+    """
+    Exercises request validation, response models, JSON encoding and JWT handling once.
+    """
+    import jwt
+    from fastapi.encoders import jsonable_encoder
+    from auth import ALGORITHM, SECRET_KEY, get_current_user
+    from schemas.post import PostCreate, PostOut
+    from schemas.user import UserCreate, UserLogin, UserOut
+    from utils.serialization import dumps
+
+    PostCreate(text="warmup")
+    UserCreate(email="warmup@example.com", password="warmup-password")
+    UserLogin(email="warmup@example.com", password="warmup-password")
+    token = jwt.encode({"sub": "0"}, SECRET_KEY, algorithm=ALGORITHM)
+    get_current_user(token)
+    post = PostOut(id=0, user_id=0, text="warmup", created_at=datetime.now())
+    user = UserOut(id=0, email="warmup@example.com", token=token)
+    json.dumps(jsonable_encoder([post, user]))
+    dumps([post, user])
+
+def _warm_cache():
+    """
+    Preloads the post lists of the WARMUP_HOT_USERS users with the most posts among
+    the WARMUP_RECENT_POSTS newest posts into the cache.
+    """
+    from services.post_service import PostService
+
+    post_service = PostService()
+    for user_id in post_service.repository.recent_authors(WARMUP_HOT_USERS, WARMUP_RECENT_POSTS):
+        post_service._get_user_posts(user_id)
+
+WARMUP_PHASES = [
+    ("db_pool", _warm_db_pool),
+    ("serialization", _warm_serialization),
+    ("cache", _warm_cache),
+]
+
+async def run_warmup():
+    """
+    Runs all warmup phases off the event loop and marks the worker ready.
+
+    Each phase is timed; a failing phase is logged and recorded but does not
+    keep the worker out of rotation, since the app can still serve (just colder).
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    for name, phase in WARMUP_PHASES:
+        if (name == "db_pool" and WARMUP_DB_CONNECTIONS <= 0) or (name == "cache" and WARMUP_HOT_USERS <= 0):
+            continue
+        phase_started = time.perf_counter()
+        try:
+            await loop.run_in_executor(None, phase)
+            warmup_state["phases"][name] = round((time.perf_counter() - phase_started) * 1000, 1)
+            print(f"Warmup phase '{name}' finished in {warmup_state['phases'][name]} ms", file=sys.stderr)
+        except Exception as e:
+            warmup_state["phases"][name] = f"failed: {e}"
+            print(f"Warmup phase '{name}' failed: {e}", file=sys.stderr)
+    warmup_state["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    warmup_state["ready"] = True
+    print(f"Warmup finished in {warmup_state['total_ms']} ms", file=sys.stderr)